@@ -0,0 +1,154 @@
+import json
+import os
+import re
+import shutil
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.common.exceptions import WebDriverException
+
+from .locator_specs import LOCATOR_JS, probe_spec
+
+
+# Guarda en window.__pomConsole los mensajes de consola y errores no capturados de la página
+CONSOLE_HOOK_SCRIPT = """
+(function (limit) {
+    if (window.__pomConsole) { return; }
+    var entries = window.__pomConsole = [];
+    function push(level, args) {
+        var parts = [];
+        for (var i = 0; i < args.length; i++) {
+            try { parts.push(typeof args[i] === 'string' ? args[i] : JSON.stringify(args[i])); }
+            catch (e) { parts.push(String(args[i])); }
+        }
+        entries.push({level: level, message: parts.join(' ').slice(0, 500), at: Date.now()});
+        if (entries.length > limit) { entries.shift(); }
+    }
+    ['error', 'warn', 'log'].forEach(function (level) {
+        var original = console[level];
+        console[level] = function () { push(level, arguments); return original.apply(console, arguments); };
+    });
+    window.addEventListener('error', function (event) { push('uncaught', [event.message]); });
+})(__LIMIT__);
+"""
+
+# Una sola llamada: HTML de la primera región que coincida (o del body) recortado,
+# título, URL y las últimas entradas de consola
+CAPTURE_SCRIPT = LOCATOR_JS + """
+var specs = arguments[0], maxChars = arguments[1], maxConsole = arguments[2];
+var region = null, regionIndex = null;
+for (var i = 0; i < specs.length && !region; i++) {
+    try { region = findAll(specs[i])[0] || null; } catch (e) {}
+    if (region) { regionIndex = i; }
+}
+var root = region ? (region.parentElement || region) : (document.body || document.documentElement);
+var html = root ? root.outerHTML : '';
+return {
+    url: location.href,
+    title: document.title,
+    region: regionIndex,
+    dom: html.slice(0, maxChars),
+    dom_truncated: html.length > maxChars,
+    dom_length: html.length,
+    console: (window.__pomConsole || []).slice(-maxConsole)
+};
+"""
+
+_CONSOLE_HOOKED = weakref.WeakSet()
+
+
+def install_console_hook(driver, limit: int = 200, force: bool = False) -> bool:
+    """Registra el hook de consola para todas las páginas de la sesión (una vez, por CDP).
+
+    Como el vigilante de modales, se registra en la pestaña activa; force=True lo repite
+    en una pestaña nueva.
+    """
+    if driver in _CONSOLE_HOOKED and not force:
+        return True
+    source = CONSOLE_HOOK_SCRIPT.replace("__LIMIT__", str(int(limit)))
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})
+    except (AttributeError, WebDriverException):
+        return False
+    _CONSOLE_HOOKED.add(driver)
+    return True
+
+
+class ArtifactCollector:
+    """Captura barata de artefactos de fallo: DOM recortado, captura de pantalla y consola.
+
+    Lo que hay que pedir al navegador se pide en el hilo del test (una llamada de script y
+    la captura de pantalla); la escritura a disco y la limpieza de capturas antiguas van a
+    un hilo en segundo plano, así que las rutas se devuelven antes de que existan.
+    """
+
+    def __init__(self, directory: str = "artifacts", max_dom_chars: int = 64 * 1024,
+                 max_console: int = 200, keep: int = 20, screenshot: bool = True):
+        self.directory = directory
+        self.max_dom_chars = max_dom_chars
+        self.max_console = max_console
+        self.keep = keep
+        self.screenshot = screenshot
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifacts")
+
+    def capture(self, driver, name: str, region_locators=()) -> dict:
+        target = os.path.join(self.directory, time.strftime("%Y%m%d-%H%M%S") + "_" + re.sub(r"[^\w.-]+", "_", name))
+        specs = [probe_spec(locator) for locator in region_locators]
+        try:
+            snapshot = driver.execute_script(CAPTURE_SCRIPT, specs, self.max_dom_chars, self.max_console)
+        except WebDriverException as e:
+            snapshot = {"error": str(e).splitlines()[0] if str(e) else type(e).__name__, "dom": "", "console": []}
+        png = None
+        if self.screenshot:
+            try:
+                png = driver.get_screenshot_as_png()
+            except WebDriverException:
+                png = None
+
+        paths = {
+            "dir": target,
+            "dom": os.path.join(target, "dom.html"),
+            "capture": os.path.join(target, "capture.json"),
+            "screenshot": os.path.join(target, "screenshot.png") if png else None,
+        }
+        snippet = (snapshot.get("dom") or "")[:200]
+        self._writer.submit(self._write, dict(paths), snapshot, png)
+        paths["snippet"] = snippet
+        return paths
+
+    def flush(self):
+        """Espera a que terminen las escrituras pendientes."""
+        self._writer.submit(lambda: None).result()
+
+    def _write(self, paths, snapshot, png):
+        os.makedirs(paths["dir"], exist_ok=True)
+        with open(paths["dom"], "w", encoding="utf-8") as handle:
+            handle.write(snapshot.pop("dom", ""))
+        with open(paths["capture"], "w", encoding="utf-8") as handle:
+            json.dump(snapshot, handle, indent=2)
+        if png:
+            with open(paths["screenshot"], "wb") as handle:
+                handle.write(png)
+        self._enforce_retention()
+
+    def _enforce_retention(self):
+        entries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.is_dir()),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in entries[:-self.keep] if self.keep else []:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+_SHARED_COLLECTOR = None
+
+
+def shared_collector() -> ArtifactCollector:
+    """Colector común configurado con ARTIFACTS_DIR y ARTIFACTS_KEEP."""
+    global _SHARED_COLLECTOR
+    if _SHARED_COLLECTOR is None:
+        _SHARED_COLLECTOR = ArtifactCollector(
+            os.environ.get("ARTIFACTS_DIR", "artifacts"), keep=int(os.environ.get("ARTIFACTS_KEEP", "20"))
+        )
+    return _SHARED_COLLECTOR
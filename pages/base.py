@@ -1,27 +1,349 @@
+import json
+import os
+import time
+import weakref
+from contextlib import contextmanager
+
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from .artifacts import install_console_hook, shared_collector
+from .instrumentation import NAVIGATION_TIMING_SCRIPT, step_log
+from .locator_cache import LocatorCache, shared_cache
+from .locator_specs import LOCATOR_JS, probe_spec
+from .throttle import shared_scheduler
+from .waits import CONDITION_MODES, create_wait_engine
+
+
+# Evalúa una lista de localizadores (CSS/XPath) en una sola llamada a execute_script.
+# Para cada uno devuelve cuántos nodos coinciden, cuántos son visibles y el texto del
+# primero que tenga texto (preferentemente visible).
+PROBE_SCRIPT = LOCATOR_JS + """
+var specs = arguments[0];
+return specs.map(function (spec, index) {
+    var nodes;
+    try {
+        nodes = findAll(spec);
+    } catch (e) {
+        return {index: index, count: 0, visible: 0, text: '', error: String(e)};
+    }
+    var visible = 0, text = '', hiddenText = '';
+    for (var i = 0; i < nodes.length; i++) {
+        var node = nodes[i];
+        if (isVisible(node)) {
+            visible++;
+            if (!text) { text = (node.innerText || node.value || '').trim(); }
+        } else if (!hiddenText) {
+            hiddenText = (node.textContent || '').trim();
+        }
+    }
+    return {index: index, count: nodes.length, visible: visible, text: (text || hiddenText).slice(0, 500)};
+});
+"""
+
+
+# Vigilante de modales: se instala una vez por documento y, con un MutationObserver, pulsa
+# los botones de cierre conocidos en cuanto se vuelven visibles. __SPECS__ se sustituye por
+# los localizadores de MODAL_CLOSE_LOCATORS; lo cerrado se acumula hasta llamar a drain().
+MODAL_WATCHDOG_SCRIPT = "(function (specs) {\n" + LOCATOR_JS + """
+    if (window.__modalWatchdog) { return; }
+    var log = [], clicked = new WeakSet(), scheduled = false;
+    function sweep() {
+        scheduled = false;
+        specs.forEach(function (spec, index) {
+            var nodes;
+            try { nodes = findAll(spec); } catch (e) { return; }
+            nodes.forEach(function (node) {
+                if (clicked.has(node) || !isVisible(node)) { return; }
+                clicked.add(node);
+                try {
+                    node.click();
+                    log.push({locator: index, text: (node.innerText || '').trim().slice(0, 80),
+                              url: location.href, at: Date.now()});
+                } catch (e) {}
+            });
+        });
+    }
+    function schedule() {
+        if (!scheduled) { scheduled = true; setTimeout(sweep, 50); }
+    }
+    window.__modalWatchdog = {drain: function () { var out = log; log = []; return out; }};
+    new MutationObserver(schedule).observe(document, {
+        childList: true, subtree: true, attributes: true,
+        attributeFilter: ['class', 'style', 'hidden', 'aria-hidden', 'open']
+    });
+    schedule();
+})(__SPECS__);
+"""
+
+MODAL_WATCHDOG_DRAIN_SCRIPT = "return window.__modalWatchdog ? window.__modalWatchdog.drain() : null;"
+
+# Sesiones con el vigilante registrado y lo que ha cerrado en cada una
+_MODAL_WATCHDOG_LOGS = weakref.WeakKeyDictionary()
+
+
+def clear_modal_watchdog_log(driver):
+    """Olvida los modales cerrados hasta ahora en la sesión (el vigilante sigue registrado).
+
+    Las sesiones del pool pasan de un test a otro: hay que llamarlo entre préstamos para que
+    modal_watchdog_log() sólo devuelva lo cerrado en el test actual.
+    """
+    log = _MODAL_WATCHDOG_LOGS.get(driver)
+    if log is not None:
+        log.clear()
 
 
 class BasePage:
-    def __init__(self, driver, timeout: int = 15):
+    # Ranking persistente de localizadores compartido por todas las páginas (None lo desactiva)
+    locator_cache = shared_cache()
+
+    # Motor de esperas: "polling" (WebDriverWait) u "observer" (MutationObserver en la página)
+    WAIT_ENGINE = os.environ.get("WAIT_ENGINE", "polling")
+
+    # Vigilante de modales dentro de la página (MODAL_WATCHDOG=0 vuelve a las esperas clásicas)
+    MODAL_WATCHDOG = os.environ.get("MODAL_WATCHDOG", "1") != "0"
+
+    # Ritmo de navegación compartido entre workers y reintentos ante bloqueo (THROTTLE_RATE; None lo desactiva)
+    scheduler = shared_scheduler()
+
+    # Botones de cierre de modales conocidos en la web
+    MODAL_CLOSE_LOCATORS = [
+        (By.ID, "modal-close"),
+        (By.XPATH, "//button[contains(., 'Entendido')]"),
+        (By.XPATH, "//button[@aria-label='Cerrar modal de modal']"),
+        (By.CSS_SELECTOR, "button[data-testid='modal-close']"),
+    ]
+
+    def __init__(self, driver, timeout: int = 15, wait_engine: str = None):
         self.driver = driver
+        self.timeout = timeout
         self.wait = WebDriverWait(driver, timeout)
+        self.waits = create_wait_engine(wait_engine or self.WAIT_ENGINE, driver, timeout)
+
+    @contextmanager
+    def timed(self, kind: str, locator=None):
+        """Registra la duración y el resultado (hit, miss o timeout) de una acción.
+
+        El diccionario que se obtiene permite sustituir el localizador registrado, por
+        ejemplo por el que ha ganado en una lista de alternativas.
+        """
+        step = {"locator": locator, "outcome": "hit"}
+        started = time.perf_counter()
+        try:
+            yield step
+        except TimeoutException:
+            step["outcome"] = "timeout"
+            raise
+        except Exception:
+            step["outcome"] = "miss"
+            raise
+        finally:
+            step_log(self.driver).add(type(self).__name__, kind, step["locator"], step["outcome"],
+                                      time.perf_counter() - started)
+
+    def record_navigation(self):
+        """Guarda la Navigation Timing de la página actual en el registro de la sesión."""
+        try:
+            step_log(self.driver).add_navigation(self.driver.execute_script(NAVIGATION_TIMING_SCRIPT))
+        except WebDriverException:
+            pass
 
     def open(self, url: str):
-        self.driver.get(url)
+        if self.MODAL_WATCHDOG:
+            self.install_modal_watchdog()
+        install_console_hook(self.driver)
+        with self.timed("navigate", url):
+            if self.scheduler is None:
+                self.driver.get(url)
+            else:
+                self.scheduler.run(self.driver, lambda: self.driver.get(url))
+        if self.MODAL_WATCHDOG and self.driver not in _MODAL_WATCHDOG_LOGS:
+            # Sin CDP el vigilante no sobrevive a la navegación: inyectarlo en la página nueva
+            self._inject_modal_watchdog()
+        self.record_navigation()
+
+    def install_modal_watchdog(self, force: bool = False) -> bool:
+        """Registra el vigilante de modales para todas las páginas que cargue esta sesión.
+
+        Usa Page.addScriptToEvaluateOnNewDocument, así que basta con hacerlo una vez por
+        sesión; sin CDP se inyecta en el documento actual (y open() lo repite en cada carga).
+        El registro sólo vale para la pestaña activa: con varias pestañas hay que llamarlo
+        con force=True en cada una (ver support/tabs.py).
+        """
+        if self.driver in _MODAL_WATCHDOG_LOGS and not force:
+            return True
+        try:
+            self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": self._modal_watchdog_source()})
+            _MODAL_WATCHDOG_LOGS.setdefault(self.driver, [])
+        except (AttributeError, WebDriverException):
+            return False
+        self._inject_modal_watchdog()
+        return True
+
+    def _modal_watchdog_source(self) -> str:
+        specs = [probe_spec(locator) for locator in self.MODAL_CLOSE_LOCATORS]
+        return MODAL_WATCHDOG_SCRIPT.replace("__SPECS__", json.dumps(specs))
+
+    def _inject_modal_watchdog(self):
+        try:
+            self.driver.execute_script(self._modal_watchdog_source())
+        except WebDriverException:
+            pass
+
+    def modal_watchdog_log(self):
+        """Modales cerrados por el vigilante en esta sesión (locator, text, url, at)."""
+        log = _MODAL_WATCHDOG_LOGS.get(self.driver, [])
+        try:
+            closed = self.driver.execute_script(MODAL_WATCHDOG_DRAIN_SCRIPT) or []
+        except WebDriverException:
+            closed = []
+        for item in closed:
+            item["locator"] = self.MODAL_CLOSE_LOCATORS[item["locator"]]
+        log.extend(closed)
+        return log
 
     def wait_for_visible(self, locator):
-        return self.wait.until(EC.visibility_of_element_located(locator))
+        with self.timed("wait_visible", locator):
+            return self.waits.until_any([locator], "visible")[0]
 
     def wait_for_clickable(self, locator):
-        return self.wait.until(EC.element_to_be_clickable(locator))
+        with self.timed("wait_clickable", locator):
+            return self.waits.until_any([locator], "clickable")[0]
+
+    def wait_for_url(self, predicate, timeout=None) -> str:
+        """Espera a que predicate(url_actual) sea cierto y devuelve la URL."""
+        with self.timed("wait_url"):
+            return self.waits.until_url(predicate, timeout)
+
+    def wait_for_any(self, locators, condition=EC.visibility_of_element_located, timeout=None):
+        """Espera a que la condición se cumpla para cualquiera de los localizadores.
+
+        Todos los candidatos se comprueban en cada iteración de una misma espera, así que el
+        peor caso es un único timeout y no uno por localizador. Devuelve una tupla
+        (resultado, índice) con el primer localizador que cumple la condición.
+        """
+        locators = list(locators)
+        key, order = self._ranked(locators)
+        mode = CONDITION_MODES.get(condition)
+        if self.waits.name != "polling" and mode is not None:
+            return self._wait_for_any_with_engine(locators, mode, timeout, key, order)
+        checks = [(index, condition(locators[index])) for index in order]
+
+        def first_match(driver):
+            for index, check in checks:
+                try:
+                    result = check(driver)
+                except WebDriverException:
+                    continue
+                if result:
+                    return result, index
+            return False
+
+        wait = self.wait if timeout is None else WebDriverWait(self.driver, timeout)
+        start = time.monotonic()
+        with self.timed("wait_any", locators) as step:
+            try:
+                result, index = wait.until(first_match, f"None of {len(locators)} locators matched")
+            except TimeoutException:
+                self._record_ranking(key, order, None, None)
+                raise
+            step["locator"] = locators[index]
+        self._record_ranking(key, order, index, time.monotonic() - start)
+        return result, index
+
+    def _wait_for_any_with_engine(self, locators, mode, timeout, key, order):
+        start = time.monotonic()
+        with self.timed("wait_any", locators) as step:
+            try:
+                element, position = self.waits.until_any([locators[index] for index in order], mode, timeout)
+            except TimeoutException:
+                self._record_ranking(key, order, None, None)
+                raise
+            index = order[position]
+            step["locator"] = locators[index]
+        self._record_ranking(key, order, index, time.monotonic() - start)
+        return element, index
+
+    def probe(self, locators):
+        """Comprueba todos los localizadores en un único viaje de ida y vuelta al navegador.
+
+        Devuelve una lista de diccionarios (index, count, visible, text), uno por localizador
+        y en el mismo orden.
+        """
+        with self.timed("script", locators):
+            return self._probe(locators)
+
+    def _probe(self, locators):
+        specs = [probe_spec(locator) for locator in locators]
+        return self.driver.execute_script(PROBE_SCRIPT, specs) or []
+
+    def wait_for_probe(self, locators, predicate=None, timeout=None, ranked=True):
+        """Repite probe() hasta que algún resultado cumpla el predicado y lo devuelve.
+
+        Por defecto espera a que algún localizador tenga al menos un nodo visible. Cada
+        iteración de la espera cuesta una sola llamada, independientemente del número de
+        localizadores. Con ranked=False se respeta siempre el orden declarado: hay que
+        usarlo cuando se lee un valor del resultado (texto, número de nodos), porque cada
+        localizador puede dar uno distinto y no debe depender de ejecuciones anteriores.
+        """
+        if predicate is None:
+            predicate = lambda result: result["visible"] > 0
+        locators = list(locators)
+        key, order = self._ranked(locators, ranked)
+
+        def first_match(driver):
+            results = self._probe(locators)
+            if len(results) != len(locators):
+                return False
+            for index in order:
+                if predicate(results[index]):
+                    return results[index]
+            return False
+
+        wait = self.wait if timeout is None else WebDriverWait(self.driver, timeout)
+        start = time.monotonic()
+        with self.timed("wait_probe", locators) as step:
+            try:
+                result = wait.until(first_match, f"None of {len(locators)} probed locators matched")
+            except TimeoutException:
+                self._record_ranking(key, order, None, None)
+                raise
+            step["locator"] = locators[result["index"]]
+        self._record_ranking(key, order, result["index"], time.monotonic() - start)
+        return result
+
+    def _ranked(self, locators, ranked=True):
+        # Orden en el que probar los localizadores según la caché (o el original si no hay caché)
+        if self.locator_cache is None or not ranked:
+            return None, list(range(len(locators)))
+        key = LocatorCache.key_for(type(self).__name__, locators)
+        return key, self.locator_cache.rank(key, len(locators))
+
+    def _record_ranking(self, key, order, winner, latency):
+        # Los candidatos comprobados antes del ganador cuentan como fallo
+        if self.locator_cache is None or key is None:
+            return
+        for index in order:
+            if index == winner:
+                self.locator_cache.record(key, index, True, latency)
+                break
+            self.locator_cache.record(key, index, False)
 
     def click(self, locator):
         element = self.wait_for_clickable(locator)
-        element.click()
+        with self.timed("click", locator):
+            element.click()
         return element
 
+    def click_any(self, locators, timeout=None):
+        """Hace click en el primer localizador clickable de la lista y devuelve su índice."""
+        element, index = self.wait_for_any(locators, EC.element_to_be_clickable, timeout)
+        with self.timed("click", locators[index]):
+            element.click()
+        return index
+
     def type_text(self, locator, text: str, clear_first: bool = True):
         element = self.wait_for_visible(locator)
         if clear_first:
@@ -29,6 +351,12 @@ class BasePage:
         element.send_keys(text)
         return element
 
+    def capture_artifacts(self, name: str, region_locators=()) -> dict:
+        """Guarda DOM recortado (alrededor de la primera región que coincida), captura de
+        pantalla y consola para diagnosticar un fallo; devuelve las rutas y un fragmento del DOM.
+        """
+        return shared_collector().capture(self.driver, f"{type(self).__name__}_{name}", region_locators)
+
     def get_current_url(self) -> str:
         return self.driver.current_url
 
@@ -43,19 +371,21 @@ class BasePage:
         """Intenta cerrar modales conocidos en la página.
 
         Devuelve True si se ha encontrado y cerrado algún modal, False en caso contrario.
+        Con el vigilante activo no hay esperas: se consulta lo que ha cerrado desde la última
+        llamada y sólo se pulsa a mano si queda algún botón de cierre visible.
         """
-        modal_locators = [
-            (By.ID, "modal-close"),
-            (By.XPATH, "//button[contains(., 'Entendido')]") ,
-            (By.XPATH, "//button[@aria-label='Cerrar modal de modal']"),
-            (By.CSS_SELECTOR, "button[data-testid='modal-close']"),
-        ]
-
-        for locator in modal_locators:
+        if self.MODAL_WATCHDOG and self.driver in _MODAL_WATCHDOG_LOGS:
             try:
-                # usar click que espera a que el elemento sea clickable
-                self.click(locator)
-                return True
+                seen = len(_MODAL_WATCHDOG_LOGS[self.driver])
+                closed = len(self.modal_watchdog_log()) > seen
+                if any(result["visible"] for result in self.probe(self.MODAL_CLOSE_LOCATORS)):
+                    self.click_any(self.MODAL_CLOSE_LOCATORS, timeout=1)
+                    closed = True
+                return closed
             except Exception:
-                continue
-        return False
+                return False
+        try:
+            self.click_any(self.MODAL_CLOSE_LOCATORS)
+            return True
+        except Exception:
+            return False
@@ -0,0 +1,96 @@
+import json
+import os
+import re
+import time
+
+
+# Cookies y claves de localStorage en las que OneTrust guarda el consentimiento
+CONSENT_COOKIE_PATTERN = re.compile(r"^(Optanon|OTAdditional|eupubconsent)", re.IGNORECASE)
+REQUIRED_COOKIES = ("OptanonConsent", "OptanonAlertBoxClosed")
+CONSENT_STORAGE_SCRIPT = """
+var items = {};
+for (var i = 0; i < localStorage.length; i++) {
+    var key = localStorage.key(i);
+    if (/optanon|onetrust|consent/i.test(key)) { items[key] = localStorage.getItem(key); }
+}
+return {origin: location.origin, items: items};
+"""
+
+
+class ConsentSnapshot:
+    """Cookies y localStorage de consentimiento capturados tras aceptar el banner de cookies.
+
+    Se inyectan por CDP antes de la primera navegación, de modo que el banner no llega a
+    mostrarse y no hay que buscar ni pulsar el botón de aceptar.
+    """
+
+    def __init__(self, cookies, local_storage, origin: str, captured_at: float = None):
+        self.cookies = cookies
+        self.local_storage = local_storage
+        self.origin = origin
+        self.captured_at = captured_at or time.time()
+
+    @classmethod
+    def capture(cls, driver):
+        cookies = [cookie for cookie in driver.get_cookies() if CONSENT_COOKIE_PATTERN.match(cookie["name"])]
+        storage = driver.execute_script(CONSENT_STORAGE_SCRIPT)
+        return cls(cookies, storage["items"], storage["origin"])
+
+    @classmethod
+    def load(cls, path: str):
+        try:
+            with open(path, encoding="utf-8") as handle:
+                data = json.load(handle)
+            return cls(data["cookies"], data["local_storage"], data["origin"], data["captured_at"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump({
+                "cookies": self.cookies,
+                "local_storage": self.local_storage,
+                "origin": self.origin,
+                "captured_at": self.captured_at,
+            }, handle, indent=2)
+
+    def is_valid(self, max_age_days: float = 30) -> bool:
+        """El snapshot tiene las cookies necesarias, ninguna ha caducado y no es demasiado antiguo."""
+        now = time.time()
+        names = {cookie["name"] for cookie in self.cookies}
+        if not all(name in names for name in REQUIRED_COOKIES):
+            return False
+        if any(cookie.get("expiry") and cookie["expiry"] <= now for cookie in self.cookies):
+            return False
+        return now - self.captured_at <= max_age_days * 24 * 3600
+
+    def inject(self, driver):
+        """Carga las cookies y programa el localStorage para la siguiente navegación.
+
+        Devuelve el identificador del script de localStorage para poder retirarlo después
+        con Page.removeScriptToEvaluateOnNewDocument (o None si no hacía falta).
+        """
+        for cookie in self.cookies:
+            params = {
+                "name": cookie["name"],
+                "value": cookie["value"],
+                "domain": cookie.get("domain"),
+                "path": cookie.get("path", "/"),
+                "secure": cookie.get("secure", False),
+                "httpOnly": cookie.get("httpOnly", False),
+            }
+            if cookie.get("expiry"):
+                params["expires"] = cookie["expiry"]
+            if cookie.get("sameSite"):
+                params["sameSite"] = cookie["sameSite"]
+            driver.execute_cdp_cmd("Network.setCookie", params)
+
+        if not self.local_storage:
+            return None
+        source = (
+            "if (location.origin === %s) { var items = %s;"
+            " for (var key in items) { localStorage.setItem(key, items[key]); } }"
+            % (json.dumps(self.origin), json.dumps(self.local_storage))
+        )
+        return driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})["identifier"]
@@ -1,10 +1,16 @@
+import os
+
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import WebDriverWait
 from .base import BasePage
+from .consent import ConsentSnapshot
 
 
 class HomePage(BasePage):
-    BASE_URL = "https://www.elcorteingles.es/"
+    # ECI_BASE_URL permite apuntar a un servidor de replay local (ver support/replay.py)
+    BASE_URL = os.environ.get("ECI_BASE_URL", "https://www.elcorteingles.es/")
 
     # Cookie locators: multiple strategies to be resilient
     ACCEPT_COOKIES_BUTTONS = [
@@ -34,37 +40,88 @@ class HomePage(BasePage):
         (By.CSS_SELECTOR, "button.search-link"),
     ]
 
+    # Snapshot del consentimiento de cookies (ver go_to_home_with_consent)
+    CONSENT_SNAPSHOT_PATH = os.environ.get("CONSENT_SNAPSHOT", os.path.join(".cache", "consent.json"))
+
+    # Consentimiento aceptado según OneTrust en la página actual
+    CONSENT_ACCEPTED_SCRIPT = "return document.cookie.indexOf('OptanonAlertBoxClosed=') !== -1;"
+
     def go_to_home(self):
         self.open(self.BASE_URL)
 
-    def accept_cookies_if_present(self):
-        for locator in self.ACCEPT_COOKIES_BUTTONS:
+    def go_to_home_with_consent(self, snapshot_path: str = None) -> bool:
+        return self.open_with_consent(self.BASE_URL, snapshot_path)
+
+    def open_with_consent(self, url: str, snapshot_path: str = None) -> bool:
+        """Abre una página del sitio reutilizando el consentimiento de cookies guardado en disco.
+
+        Si el snapshot es válido se inyecta antes de navegar y el banner no llega a salir.
+        Si no existe, ha caducado o la web no lo acepta, se sigue el camino normal (pulsar
+        aceptar) y se guarda un snapshot nuevo. Devuelve True si se ha usado el snapshot.
+        """
+        path = snapshot_path or self.CONSENT_SNAPSHOT_PATH
+        snapshot = ConsentSnapshot.load(path)
+        script_id = None
+        if snapshot is not None and snapshot.is_valid():
             try:
-                self.click(locator)
+                script_id = snapshot.inject(self.driver)
+            except Exception:
+                snapshot = None
+
+        try:
+            self.open(url)
+        finally:
+            if script_id is not None:
+                # Sólo hacía falta para la primera navegación; si se queda, la sesión del pool
+                # lo arrastraría a los tests siguientes
+                try:
+                    self.driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": script_id})
+                except WebDriverException:
+                    pass
+
+        if snapshot is not None and snapshot.is_valid() and self.consent_accepted():
+            if not any(result["visible"] for result in self.probe(self.ACCEPT_COOKIES_BUTTONS)):
                 return True
+
+        if self.accept_cookies_if_present():
+            try:
+                WebDriverWait(self.driver, 5).until(lambda d: self.consent_accepted())
+                ConsentSnapshot.capture(self.driver).save(path)
             except Exception:
-                continue
-        # If none clicked, assume no banner or already accepted
+                pass
         return False
 
+    def consent_accepted(self) -> bool:
+        return bool(self.driver.execute_script(self.CONSENT_ACCEPTED_SCRIPT))
+
+    def accept_cookies_if_present(self, timeout=None):
+        try:
+            self.click_any(self.ACCEPT_COOKIES_BUTTONS, timeout)
+            return True
+        except Exception:
+            # If none clicked, assume no banner or already accepted
+            return False
+
     def search(self, query: str):
+        if self.scheduler is None:
+            return self._search(query)
+        # Si el envío acaba en la página de bloqueo se vuelve a la home y se repite la búsqueda
+        return self.scheduler.run(self.driver, lambda: self._search(query), recover=self.go_to_home)
+
+    def _search(self, query: str):
         # Primero intentamos abrir la barra de búsqueda si existe un trigger
-        for btn_locator in self.SEARCH_BUTTON_LOCATORS:
-            try:
-                # No fallamos si no existe; con éxito salimos
-                self.click(btn_locator)
-                break
-            except Exception:
-                continue
+        try:
+            # No fallamos si no existe
+            self.click_any(self.SEARCH_BUTTON_LOCATORS)
+        except Exception:
+            pass
 
         # Ahora buscamos el input visible
         search_input = None
-        for locator in self.SEARCH_INPUT_LOCATORS:
-            try:
-                search_input = self.wait_for_visible(locator)
-                break
-            except Exception:
-                continue
+        try:
+            search_input, _ = self.wait_for_any(self.SEARCH_INPUT_LOCATORS)
+        except Exception:
+            pass
 
         if not search_input:
             raise RuntimeError("Search input not found with available locators.")
@@ -91,16 +148,17 @@ class HomePage(BasePage):
         # Esperar hasta que la URL o el título de resultados reflejen la búsqueda
         try:
             # esperar que el parámetro de búsqueda aparezca en la URL
-            self.wait.until(lambda d: query.lower() in d.current_url.lower())
+            self.wait_for_url(lambda url: query.lower() in url.lower())
+            self.record_navigation()
             return True
         except Exception:
             # Si no aparece en la URL, intentar esperar por un título de resultados
             from selenium.webdriver.common.by import By as _By
-            from selenium.webdriver.support import expected_conditions as _EC
             try:
                 # Esperar un h1 visible y comprobar su texto
-                h1 = self.wait.until(_EC.visibility_of_element_located(( _By.CSS_SELECTOR, "h1" )))
+                h1 = self.wait_for_visible((_By.CSS_SELECTOR, "h1"))
                 if query.lower() in h1.text.lower():
+                    self.record_navigation()
                     return True
             except Exception:
                 pass
@@ -0,0 +1,98 @@
+import csv
+import json
+import os
+import re
+import time
+import weakref
+
+
+# Navigation Timing de la página actual más un resumen de los recursos por tipo
+NAVIGATION_TIMING_SCRIPT = """
+var nav = performance.getEntriesByType('navigation')[0];
+var summary = {};
+performance.getEntriesByType('resource').forEach(function (entry) {
+    var item = summary[entry.initiatorType] || (summary[entry.initiatorType] = {count: 0, bytes: 0, duration_ms: 0});
+    item.count += 1;
+    item.bytes += entry.transferSize || 0;
+    item.duration_ms += entry.duration;
+});
+return {
+    url: location.href,
+    navigation: nav ? nav.toJSON() : null,
+    resources: summary
+};
+"""
+
+STEP_FIELDS = ["page", "kind", "locator", "outcome", "duration_ms", "started_at"]
+
+
+def describe_locator(locator) -> str:
+    if locator is None:
+        return ""
+    if isinstance(locator, tuple) and len(locator) == 2 and isinstance(locator[0], str):
+        return f"{locator[0]}={locator[1]}"
+    if isinstance(locator, (list, tuple)):
+        return f"any of {len(locator)} locators"
+    return str(locator)
+
+
+class StepLog:
+    """Registro de las acciones de los page objects (esperas, clicks, búsquedas y scripts)
+    y de las métricas de cada navegación de una sesión de navegador.
+    """
+
+    def __init__(self):
+        self.steps = []
+        self.navigations = []
+
+    def add(self, page: str, kind: str, locator, outcome: str, duration: float):
+        self.steps.append({
+            "page": page,
+            "kind": kind,
+            "locator": describe_locator(locator),
+            "outcome": outcome,
+            "duration_ms": round(duration * 1000, 1),
+            "started_at": round(time.time() - duration, 3),
+        })
+
+    def add_navigation(self, timing: dict):
+        if timing and (not self.navigations or self.navigations[-1].get("url") != timing.get("url")):
+            self.navigations.append(timing)
+
+    def clear(self):
+        self.steps = []
+        self.navigations = []
+
+    def summary(self) -> dict:
+        """Tiempo total y número de pasos agrupado por (tipo, resultado)."""
+        totals = {}
+        for step in self.steps:
+            key = f"{step['kind']}:{step['outcome']}"
+            item = totals.setdefault(key, {"count": 0, "duration_ms": 0.0})
+            item["count"] += 1
+            item["duration_ms"] = round(item["duration_ms"] + step["duration_ms"], 1)
+        return totals
+
+    def write_report(self, directory: str, name: str):
+        """Escribe <name>.json (todo) y <name>.csv (sólo los pasos); devuelve ambas rutas."""
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, re.sub(r"[^\w.-]+", "_", name))
+        with open(base + ".json", "w", encoding="utf-8") as handle:
+            json.dump({"summary": self.summary(), "steps": self.steps, "navigations": self.navigations},
+                      handle, indent=2)
+        with open(base + ".csv", "w", newline="", encoding="utf-8") as handle:
+            writer = csv.DictWriter(handle, fieldnames=STEP_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.steps)
+        return base + ".json", base + ".csv"
+
+
+_STEP_LOGS = weakref.WeakKeyDictionary()
+
+
+def step_log(driver) -> StepLog:
+    """StepLog asociado a una sesión; lo comparten todas las páginas que usan ese driver."""
+    log = _STEP_LOGS.get(driver)
+    if log is None:
+        log = _STEP_LOGS[driver] = StepLog()
+    return log
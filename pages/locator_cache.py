@@ -0,0 +1,131 @@
+import atexit
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from .file_lock import file_lock
+
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "locators.json")
+
+
+class LocatorCache:
+    """Ranking persistente de localizadores por tasa de acierto reciente y latencia.
+
+    Cada lista de localizadores se identifica por la clase de la página y un hash de la
+    propia lista, de modo que si se cambia la lista en el código la entrada antigua deja
+    de usarse y acaba expirando. Los contadores decaen en cada registro para que pesen
+    más los resultados recientes que los históricos.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_age_days: float = 14, decay: float = 0.8):
+        self.path = path
+        self.max_age = max_age_days * 24 * 3600
+        self.decay = decay
+        self._entries = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def key_for(page_name: str, locators) -> str:
+        digest = hashlib.sha1(repr([tuple(locator) for locator in locators]).encode("utf-8")).hexdigest()
+        return f"{page_name}:{digest[:12]}"
+
+    def rank(self, key: str, size: int):
+        """Devuelve los índices 0..size-1 ordenados del más al menos prometedor."""
+        with self._lock:
+            stats = self._entries.get(key, {}).get("locators", {})
+            now = time.time()
+
+            def score(index):
+                item = stats.get(str(index))
+                if not item or now - item["updated"] > self.max_age:
+                    # Sin datos recientes: prior neutro, se mantiene el orden original
+                    return (-0.5, float("inf"), index)
+                hit_rate = (item["hits"] + 1) / (item["hits"] + item["misses"] + 2)
+                latency = item["latency"] if item["latency"] is not None else float("inf")
+                return (-hit_rate, latency, index)
+
+            return sorted(range(size), key=score)
+
+    def record(self, key: str, index: int, hit: bool, latency: float = None):
+        with self._lock:
+            entry = self._entries.setdefault(key, {"locators": {}})
+            item = entry["locators"].setdefault(
+                str(index), {"hits": 0.0, "misses": 0.0, "latency": None, "updated": 0.0}
+            )
+            item["hits"] = item["hits"] * self.decay + (1 if hit else 0)
+            item["misses"] = item["misses"] * self.decay + (0 if hit else 1)
+            if hit and latency is not None:
+                if item["latency"] is None:
+                    item["latency"] = latency
+                else:
+                    item["latency"] = item["latency"] * self.decay + latency * (1 - self.decay)
+            item["updated"] = entry["updated"] = time.time()
+            self._dirty = True
+
+    def evict_stale(self):
+        """Elimina las entradas que no se han usado en max_age segundos."""
+        with self._lock:
+            limit = time.time() - self.max_age
+            stale = [key for key, entry in self._entries.items() if entry.get("updated", 0) < limit]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self._dirty = True
+            return len(stale)
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            # Leer, mezclar y escribir bajo un lock de fichero: otros procesos (workers de
+            # support.parallel_runner) pueden estar guardando la misma caché a la vez
+            with file_lock(self.path + ".lock"):
+                self._merge(self._read())
+                # Escritura atómica para que nadie lea un fichero a medias
+                fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                    json.dump(self._entries, handle, indent=1, sort_keys=True)
+                os.replace(tmp_path, self.path)
+            self._dirty = False
+
+    def _merge(self, stored: dict):
+        # Por cada localizador se queda la estadística registrada más recientemente
+        for key, entry in stored.items():
+            mine = self._entries.setdefault(key, {"locators": {}})
+            mine.setdefault("locators", {})
+            for index, item in entry.get("locators", {}).items():
+                if item.get("updated", 0) > mine["locators"].get(index, {}).get("updated", 0):
+                    mine["locators"][index] = item
+            mine["updated"] = max(mine.get("updated", 0), entry.get("updated", 0))
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return {}
+
+    def _load(self):
+        self._entries = self._read()
+        self.evict_stale()
+
+
+def shared_cache():
+    """Caché compartida por todas las páginas, o None si LOCATOR_CACHE=off.
+
+    Se guarda al salir del intérprete; los procesos que terminan sin pasar por atexit
+    (workers de ProcessPoolExecutor) tienen que llamar a flush() ellos mismos.
+    """
+    if os.environ.get("LOCATOR_CACHE", "").lower() in ("0", "off", "false", "no"):
+        return None
+    cache = LocatorCache(os.environ.get("LOCATOR_CACHE_PATH", DEFAULT_CACHE_PATH))
+    atexit.register(cache.flush)
+    return cache
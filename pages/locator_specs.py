@@ -0,0 +1,42 @@
+from selenium.webdriver.common.by import By
+
+
+# Funciones comunes a todos los scripts que reciben localizadores como specs de probe_spec:
+# se antepone al cuerpo de cada script para que el formato de los specs y la regla de
+# visibilidad estén en un solo sitio.
+LOCATOR_JS = """
+function isVisible(el) {
+    return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+}
+function findAll(spec) {
+    if (spec[0] === 'xpath') {
+        var snapshot = document.evaluate(spec[1], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var nodes = [];
+        for (var i = 0; i < snapshot.snapshotLength; i++) { nodes.push(snapshot.snapshotItem(i)); }
+        return nodes;
+    }
+    return Array.prototype.slice.call(document.querySelectorAll(spec[1]));
+}
+"""
+
+
+def probe_spec(locator):
+    """Traduce un localizador de Selenium a la pareja (tipo, selector) que entienden los scripts con LOCATOR_JS."""
+    by, value = locator
+    if by == By.XPATH:
+        return ["xpath", value]
+    if by == By.CSS_SELECTOR:
+        return ["css", value]
+    if by == By.ID:
+        return ["css", '[id="%s"]' % value]
+    if by == By.NAME:
+        return ["css", '[name="%s"]' % value]
+    if by == By.CLASS_NAME:
+        return ["css", "." + value]
+    if by == By.TAG_NAME:
+        return ["css", value]
+    if by == By.LINK_TEXT:
+        return ["xpath", '//a[normalize-space(.)="%s"]' % value]
+    if by == By.PARTIAL_LINK_TEXT:
+        return ["xpath", '//a[contains(., "%s")]' % value]
+    raise ValueError(f"Unsupported locator strategy for probe: {by}")
@@ -11,7 +11,9 @@ class ProductDetailPage(BasePage):
     ]
 
     def is_on_product_detail(self) -> bool:
-        for locator in self.DETAIL_INDICATORS:
-            if self.element_exists(locator):
-                return True
-        return False
+        self.record_navigation()
+        try:
+            self.wait_for_probe(self.DETAIL_INDICATORS)
+            return True
+        except Exception:
+            return False
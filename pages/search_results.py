@@ -1,5 +1,80 @@
+import time
+import uuid
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit
+
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from .base import BasePage
+from .locator_specs import LOCATOR_JS, probe_spec
+from .home import HomePage
+
+
+# Extrae hasta arguments[2] tarjetas aún no leídas (marcadas con data-pom-seen=<token>) y las
+# marca. Si ya no quedan tarjetas pendientes hace scroll para que el grid cargue más.
+EXTRACT_PRODUCTS_SCRIPT = """
+var selector = arguments[0], token = arguments[1], max = arguments[2], fields = arguments[3];
+var pendingSelector = selector + ":not([data-pom-seen='" + token + "'])";
+var nodes = document.querySelectorAll(pendingSelector);
+var items = [];
+function fieldText(card, fieldSelector) {
+    var el = card.querySelector(fieldSelector);
+    return el ? (el.innerText || el.textContent || '').trim() : '';
+}
+for (var i = 0; i < nodes.length && items.length < max; i++) {
+    var card = nodes[i];
+    card.setAttribute('data-pom-seen', token);
+    var link = card.querySelector('a[href]');
+    var item = {id: card.id.replace(/^product-/, ''), href: link ? link.href : ''};
+    for (var name in fields) { item[name] = fieldText(card, fields[name]); }
+    items.push(item);
+}
+var pending = nodes.length - items.length;
+if (!pending) {
+    var all = document.querySelectorAll(selector);
+    if (all.length) { all[all.length - 1].scrollIntoView({block: 'end'}); }
+    window.scrollTo(0, document.documentElement.scrollHeight);
+}
+return {items: items, pending: pending};
+"""
+
+
+# Recorre los localizadores de enlace a producto en orden y devuelve hasta arguments[1] hrefs
+# distintos (el primero es el del primer producto). Los arguments[2] primeros se añaden como
+# <link rel=prefetch> para que la ficha de detalle cargue desde caché.
+FIRST_PRODUCT_HREFS_SCRIPT = LOCATOR_JS + """
+var specs = arguments[0], max = Math.max(1, arguments[1]), prefetch = arguments[2];
+var hrefs = [];
+function hrefOf(node) {
+    var link = node.tagName === 'A' ? node : (node.querySelector('a[href]') || node.closest('a[href]'));
+    return link && /^https?:/.test(link.href) ? link.href.split('#')[0] : '';
+}
+for (var i = 0; i < specs.length && hrefs.length < max; i++) {
+    var nodes;
+    try { nodes = findAll(specs[i]); } catch (e) { continue; }
+    for (var k = 0; k < nodes.length && hrefs.length < max; k++) {
+        var href = hrefOf(nodes[k]);
+        if (href && hrefs.indexOf(href) === -1) { hrefs.push(href); }
+    }
+}
+var existing = Array.prototype.map.call(document.querySelectorAll('link[rel="prefetch"]'), function (l) { return l.href; });
+hrefs.slice(0, prefetch).forEach(function (href) {
+    if (existing.indexOf(href) !== -1) { return; }
+    var link = document.createElement('link');
+    link.rel = 'prefetch';
+    link.href = href;
+    document.head.appendChild(link);
+});
+return hrefs;
+"""
+
+
+def format_filter_matrix(rows) -> str:
+    """Tabla de texto con el resultado de SearchResultsPage.brand_filter_matrix."""
+    lines = [f"{'brand':24} {'count':>7} {'delta':>7} {'mode':>5} {'seconds':>8}"]
+    for row in rows:
+        brand = row["brand"] if row["brand"] is not None else "(all)"
+        lines.append(f"{brand:24} {row['count']:7d} {row['delta']:+7d} {row['mode']:>5} {row['seconds']:8.2f}")
+    return "\n".join(lines)
 
 
 class SearchResultsPage(BasePage):
@@ -23,18 +98,74 @@ class SearchResultsPage(BasePage):
         (By.XPATH, "//button[contains(., 'Marca') or contains(., 'Marcas')]"),
         (By.CSS_SELECTOR, "button[aria-controls*='brand'], button[aria-label*='Marca']"),
     ]
-    BRAND_OPTION_TEMPLATE = "//label[contains(., '{brand}') or //span[contains(., '{brand}')]]"
+    BRAND_OPTION_TEMPLATE = "//label[contains(., '{brand}') or .//span[contains(., '{brand}')]]"
     APPLY_FILTER_BUTTON_LOCATORS = [
         (By.XPATH, "//button[contains(., 'Aplicar')]"),
         (By.CSS_SELECTOR, "button[type='submit'][class*='apply']"),
     ]
 
+    # Contenedor del grid con scroll infinito donde se cargan las tarjetas de producto
+    INFINITE_SCROLL_CONTAINER_LOCATORS = [
+        (By.CSS_SELECTOR, "div[data-testid='infiniteScroll']"),
+        (By.CSS_SELECTOR, "div.container__infinite_scroll.infinite-scroll-container"),
+    ]
+
     PRODUCT_GRID_ITEMS_LOCATORS = [
         (By.CSS_SELECTOR, "[data-testid*='product-card']"),
         (By.CSS_SELECTOR, "article[class*='product']"),
         (By.XPATH, "//a[contains(@href, '/producto/')]/ancestor::article"),
     ]
 
+    # Tarjetas del grid con scroll infinito y los campos que se extraen de cada una
+    PRODUCT_CARD_SELECTOR = "article[id^='product-']"
+    PRODUCT_FIELD_SELECTORS = {
+        "brand": "p.product_preview-brand--text, [class*='brand']",
+        "name": "[itemprop='name'], h3, [class*='title']",
+        "price": "[class*='price']",
+    }
+
+    # URL directa de resultados; el formato de las facetas se comprueba contra la UI en test_06
+    SEARCH_PATH = "search-nwx/1/"
+    SEARCH_QUERY_PARAM = "s"
+    FACET_PARAM = "f"
+    FACET_TEMPLATE = "{name}::{value}"
+
+    def build_search_url(self, query: str, filters=None) -> str:
+        """URL de resultados para `query`; `filters` es un dict faceta -> valor o lista de valores,
+        por ejemplo {"brand": ["Nike", "Adidas"]}.
+        """
+        params = [(self.SEARCH_QUERY_PARAM, query)]
+        for name, values in (filters or {}).items():
+            for value in ([values] if isinstance(values, str) else values):
+                params.append((self.FACET_PARAM, self.FACET_TEMPLATE.format(name=name, value=value)))
+        return urljoin(HomePage.BASE_URL, self.SEARCH_PATH) + "?" + urlencode(params)
+
+    def open_for_query(self, query: str, filters=None, accept_cookies: bool = True):
+        """Navega directamente a los resultados sin pasar por la home ni la barra de búsqueda."""
+        url = self.build_search_url(query, filters)
+        if accept_cookies:
+            HomePage(self.driver, self.timeout).open_with_consent(url)
+        else:
+            self.open(url)
+
+    def matches_search_url(self, url: str, query: str) -> bool:
+        """Comprueba que `url` (p. ej. la obtenida buscando desde la UI) tiene la misma ruta
+        y el mismo parámetro de búsqueda que build_search_url(query).
+        """
+        expected = urlsplit(self.build_search_url(query))
+        actual = urlsplit(url)
+        actual_query = [value.lower() for key, value in parse_qsl(actual.query) if key == self.SEARCH_QUERY_PARAM]
+        return actual.path == expected.path and query.lower() in actual_query
+
+    def matches_facet_url(self, url: str, name: str, value: str) -> bool:
+        """Comprueba que `url` lleva la faceta name=value con el formato de build_search_url.
+
+        Sirve para verificar FACET_PARAM/FACET_TEMPLATE contra la URL a la que lleva la UI
+        al marcar un filtro (ver test_06 en tests/test.py).
+        """
+        expected = self.FACET_TEMPLATE.format(name=name, value=value).lower()
+        return any(key == self.FACET_PARAM and item.lower() == expected for key, item in parse_qsl(urlsplit(url).query))
+
     def get_results_title_text(self) -> str:
         # Cerrar modal si aparece tras la búsqueda
         try:
@@ -43,24 +174,16 @@ class SearchResultsPage(BasePage):
             pass
 
         # Intento 1: localizar un h1 habitual
-        for locator in self.RESULTS_TITLE_LOCATORS:
-            try:
-                el = self.wait_for_visible(locator)
-                text = el.text.strip()
-                if text:
-                    return text
-            except Exception:
-                continue
+        try:
+            hit = self.wait_for_probe(self.RESULTS_TITLE_LOCATORS, lambda r: r["visible"] and r["text"], ranked=False)
+            return hit["text"]
+        except Exception:
+            pass
 
         # Intento 2: esperar a que aparezcan elementos de producto y revisar el título de la página
         try:
-            for prod_locator in self.PRODUCT_GRID_ITEMS_LOCATORS:
-                try:
-                    # esperar hasta que haya al menos un elemento de producto
-                    self.wait.until(lambda d, l=prod_locator: len(d.find_elements(*l)) > 0)
-                    break
-                except Exception:
-                    continue
+            # esperar hasta que haya al menos un elemento de producto
+            self.wait_for_probe(self.PRODUCT_GRID_ITEMS_LOCATORS, lambda r: r["count"] > 0)
         except Exception:
             pass
 
@@ -109,25 +232,43 @@ class SearchResultsPage(BasePage):
             "article[class*='product']",
         ]
         try:
-            for sel in product_title_selectors:
-                try:
-                    els = self.driver.find_elements(By.CSS_SELECTOR, sel)
-                    for e in els:
-                        txt = (e.text or e.get_attribute('innerText') or '').strip()
-                        if txt:
-                            return txt
-                except Exception:
-                    continue
+            # una sola llamada para todos los selectores
+            for result in self.probe([(By.CSS_SELECTOR, sel) for sel in product_title_selectors]):
+                if result["text"]:
+                    return result["text"]
         except Exception:
             pass
 
         # No hemos conseguido detectar el título; devolver información de depuración
-        snippet = ""
+        artifacts = self.capture_artifacts("results_title", self.RESULTS_TITLE_LOCATORS + self.PRODUCT_GRID_ITEMS_LOCATORS)
+        raise RuntimeError(f"Results title not found with available locators. page_title='{page_title}' snippet='{artifacts['snippet']}' url='{self.driver.current_url}' artifacts='{artifacts['dir']}'")
+
+    def product_hrefs(self, top: int = 1, prefetch: int = 0):
+        """Enlaces de los `top` primeros productos en una sola llamada; prefetch de los `prefetch` primeros."""
+        specs = [probe_spec(locator) for locator in self.FIRST_PRODUCT_LINK_LOCATORS]
+        specs.append(["css", self.PRODUCT_CARD_SELECTOR])
+        with self.timed("script", "product_hrefs") as step:
+            hrefs = self.driver.execute_script(FIRST_PRODUCT_HREFS_SCRIPT, specs, max(top, prefetch), prefetch) or []
+            step["outcome"] = "hit" if hrefs else "miss"
+        return hrefs
+
+    def open_first_product(self, prefetch: int = 0):
+        """Navega directamente al href del primer producto en lugar de pulsar la tarjeta.
+
+        Con `prefetch` > 0 deja precargadas las fichas de los primeros productos, útil si
+        después se van a visitar más. Si no se encuentra ningún href se usa el camino de
+        click_first_product, que es también el que hay que usar para probar el propio click.
+        """
         try:
-            snippet = self.driver.page_source[:1000]
+            self.close_modal_if_present()
         except Exception:
             pass
-        raise RuntimeError(f"Results title not found with available locators. page_title='{page_title}' snippet='{snippet[:200]}' url='{self.driver.current_url}'")
+        hrefs = self.product_hrefs(1, prefetch)
+        if not hrefs:
+            self.click_first_product()
+            return []
+        self.open(hrefs[0])
+        return hrefs
 
     def click_first_product(self):
         # A veces un modal bloquea la interacción; intentar cerrarlo primero
@@ -136,21 +277,22 @@ class SearchResultsPage(BasePage):
         except Exception:
             pass
         # Primero intentar con los localizadores directos
-        for locator in self.FIRST_PRODUCT_LINK_LOCATORS:
-            try:
-                self.click(locator)
-                return
-            except Exception:
-                continue
+        try:
+            self.click_any(self.FIRST_PRODUCT_LINK_LOCATORS)
+            return
+        except Exception:
+            pass
 
         # Nuevo fallback prioritario: buscar el primer <article> dentro del contenedor de "infinite scroll"
         try:
             container = None
             try:
-                container = self.driver.find_element(By.CSS_SELECTOR, "div[data-testid='infiniteScroll']")
+                with self.timed("find", self.INFINITE_SCROLL_CONTAINER_LOCATORS[0]):
+                    container = self.driver.find_element(*self.INFINITE_SCROLL_CONTAINER_LOCATORS[0])
             except Exception:
                 try:
-                    container = self.driver.find_element(By.CSS_SELECTOR, "div.container__infinite_scroll.infinite-scroll-container")
+                    with self.timed("find", self.INFINITE_SCROLL_CONTAINER_LOCATORS[1]):
+                        container = self.driver.find_element(*self.INFINITE_SCROLL_CONTAINER_LOCATORS[1])
                 except Exception:
                     container = None
 
@@ -189,12 +331,13 @@ class SearchResultsPage(BasePage):
                         if clicked:
                             before = self.driver.current_url
                             try:
-                                self.wait.until(lambda d: d.current_url != before and ('/producto' in d.current_url or '/product' in d.current_url or '/p/' in d.current_url))
+                                self.wait_for_url(lambda url: url != before and ('/producto' in url or '/product' in url or '/p/' in url))
                                 return
                             except Exception:
                                 # Intentar detectar indicadores de página de detalle
                                 try:
-                                    self.wait.until(lambda d: len(d.find_elements(By.CSS_SELECTOR, "h1[itemprop='name'], button[id*='add-to-cart'], section.product-detail")) > 0)
+                                    with self.timed("wait_detail"):
+                                        self.waits.until_any([(By.CSS_SELECTOR, "h1[itemprop='name'], button[id*='add-to-cart'], section.product-detail")], "present")
                                     return
                                 except Exception:
                                     # si no conseguimos detectar navegación, continuar con siguientes artículos
@@ -207,7 +350,8 @@ class SearchResultsPage(BasePage):
         # Fallbacks anteriores: buscar en grid y por hrefs generales
         for grid_locator in self.PRODUCT_GRID_ITEMS_LOCATORS:
             try:
-                grid_items = self.driver.find_elements(*grid_locator)
+                with self.timed("find", grid_locator):
+                    grid_items = self.driver.find_elements(*grid_locator)
                 for item in grid_items:
                     try:
                         anchor = None
@@ -232,7 +376,9 @@ class SearchResultsPage(BasePage):
                 continue
 
         try:
-            anchors = self.driver.find_elements(By.XPATH, "//a[contains(@href,'/producto') or contains(@href,'/product') or contains(@href,'/p/') or contains(@href,'/articulo')]")
+            anchors_locator = (By.XPATH, "//a[contains(@href,'/producto') or contains(@href,'/product') or contains(@href,'/p/') or contains(@href,'/articulo')]")
+            with self.timed("find", anchors_locator):
+                anchors = self.driver.find_elements(*anchors_locator)
             if anchors:
                 try:
                     anchors[0].click()
@@ -247,12 +393,8 @@ class SearchResultsPage(BasePage):
             pass
 
         # Si no se encuentra ningún enlace, lanzar error con información de depuración
-        snippet = ""
-        try:
-            snippet = self.driver.page_source[:500]
-        except Exception:
-            pass
-        raise RuntimeError(f"No product link found to click. url='{self.driver.current_url}' snippet='{snippet[:200]}'")
+        artifacts = self.capture_artifacts("first_product", self.INFINITE_SCROLL_CONTAINER_LOCATORS + self.PRODUCT_GRID_ITEMS_LOCATORS)
+        raise RuntimeError(f"No product link found to click. url='{self.driver.current_url}' snippet='{artifacts['snippet']}' artifacts='{artifacts['dir']}'")
 
     def open_brand_filter(self):
         # Cerrar modal si aparece
@@ -261,13 +403,11 @@ class SearchResultsPage(BasePage):
         except Exception:
             pass
 
-        for locator in self.BRAND_FILTER_TOGGLE_LOCATORS:
-            try:
-                self.click(locator)
-                return True
-            except Exception:
-                continue
-        return False
+        try:
+            self.click_any(self.BRAND_FILTER_TOGGLE_LOCATORS)
+            return True
+        except Exception:
+            return False
 
     def choose_brand(self, brand_name: str):
         # Use a dynamic XPath to find the brand option
@@ -279,35 +419,128 @@ class SearchResultsPage(BasePage):
         except Exception:
             return False
 
-    def apply_filter(self):
-        for locator in self.APPLY_FILTER_BUTTON_LOCATORS:
-            try:
-                self.click(locator)
-                return True
-            except Exception:
+    def apply_filter(self, timeout=None):
+        try:
+            self.click_any(self.APPLY_FILTER_BUTTON_LOCATORS, timeout)
+            return True
+        except Exception:
+            # Some UIs auto-apply filters on click; returning False is acceptable
+            return False
+
+    def brand_filter_matrix(self, query: str, brands, mode: str = "ui", settle_timeout: float = 5.0):
+        """Cuenta los productos de `query` filtrando por cada marca de `brands`.
+
+        Los resultados se cargan una sola vez. En modo "ui" cada marca se marca y desmarca
+        en el propio desplegable sobre la misma página; si la UI no deja seleccionarla se
+        recurre a la URL con la faceta. En modo "url" se navega directamente a la URL
+        filtrada de cada marca. Devuelve una fila por marca (brand, count, delta, mode,
+        seconds); la primera fila, con brand None, es el total sin filtrar. El modo "url?"
+        indica que la URL filtrada no ha cambiado el número de productos, así que no hay
+        garantía de que la faceta se haya aplicado.
+        """
+        base_url = self.build_search_url(query)
+        self.open_for_query(query)
+        baseline = self.count_listed_products()
+        rows = [{"brand": None, "count": baseline, "delta": 0, "mode": "base", "seconds": 0.0}]
+        on_base_page = True
+
+        for brand in brands:
+            started = time.perf_counter()
+            used = mode
+            count = None
+            if mode == "ui":
+                if not on_base_page:
+                    self.open(base_url)
+                    on_base_page = True
+                if self._toggle_brand(brand, settle_timeout):
+                    count = self._count_after_change(baseline, settle_timeout)
+                    # Desmarcar para dejar la página como estaba para la siguiente marca; si no
+                    # vuelve al total sin filtrar, recargar la URL base antes de la siguiente
+                    if not self._toggle_brand(brand, settle_timeout) or \
+                            self._count_after_change(count, settle_timeout) != baseline:
+                        on_base_page = False
+                else:
+                    used = "url"
+            if count is None:
+                self.open(self.build_search_url(query, {"brand": brand}))
+                on_base_page = False
+                count = self.count_listed_products()
+                if count == baseline:
+                    # La web ignora las facetas que no entiende: sin cambio puede que no se haya filtrado
+                    used = "url?"
+            rows.append({
+                "brand": brand,
+                "count": count,
+                "delta": count - baseline,
+                "mode": used,
+                "seconds": round(time.perf_counter() - started, 2),
+            })
+        return rows
+
+    def _toggle_brand(self, brand: str, timeout: float) -> bool:
+        option = (By.XPATH, self.BRAND_OPTION_TEMPLATE.format(brand=brand))
+        # El desplegable puede seguir abierto de la marca anterior
+        if not self.probe([option])[0]["visible"] and not self.open_brand_filter():
+            return False
+        try:
+            self.click_any([option], timeout)
+        except Exception:
+            return False
+        self.apply_filter(timeout=1)
+        return True
+
+    def _count_after_change(self, previous: int, timeout: float) -> int:
+        # Dar tiempo a que el grid se actualice; si el número no cambia se devuelve igualmente
+        try:
+            return self.wait_for_probe(
+                self.PRODUCT_GRID_ITEMS_LOCATORS, lambda r: r["count"] > 0 and r["count"] != previous, timeout,
+                ranked=False,
+            )["count"]
+        except Exception:
+            return self.count_listed_products()
+
+    def iter_products(self, limit: int = None, batch_size: int = 48, idle_timeout: float = 5.0):
+        """Recorre el grid de resultados haciendo scroll y genera un dict por producto
+        (id, href, brand, name, price) a medida que se cargan las tarjetas.
+
+        Cada lote se lee con una sola llamada y las tarjetas ya leídas quedan marcadas en
+        el DOM, así que no se vuelven a leer ni se guardan en memoria. Termina al llegar a
+        `limit` o cuando pasan `idle_timeout` segundos sin que aparezcan tarjetas nuevas;
+        quien lo consume puede parar antes simplemente dejando de iterar.
+        """
+        token = uuid.uuid4().hex[:8]
+        pending_locator = (By.CSS_SELECTOR, f"{self.PRODUCT_CARD_SELECTOR}:not([data-pom-seen='{token}'])")
+        yielded = 0
+        while limit is None or yielded < limit:
+            size = batch_size if limit is None else min(batch_size, limit - yielded)
+            with self.timed("script", (By.CSS_SELECTOR, self.PRODUCT_CARD_SELECTOR)):
+                batch = self.driver.execute_script(
+                    EXTRACT_PRODUCTS_SCRIPT, self.PRODUCT_CARD_SELECTOR, token, size, self.PRODUCT_FIELD_SELECTORS
+                )
+            for item in batch["items"]:
+                yield item
+            yielded += len(batch["items"])
+            if batch["items"] or batch["pending"]:
                 continue
-        # Some UIs auto-apply filters on click; returning False is acceptable
-        return False
+            # Ya se ha hecho scroll: esperar a que el grid añada tarjetas nuevas
+            try:
+                with self.timed("wait_products", pending_locator):
+                    self.waits.until_any([pending_locator], "present", idle_timeout)
+            except TimeoutException:
+                return
 
     def count_listed_products(self) -> int:
-        # Count by first available locator that yields elements
+        # Count by first locator (in list order) that yields elements
         # Cerrar modal si aparece y bloquea las tarjetas
         try:
             self.close_modal_if_present()
         except Exception:
             pass
 
-        for locator in self.PRODUCT_GRID_ITEMS_LOCATORS:
-            try:
-                elements = self.driver.find_elements(*locator)
-                if elements:
-                    return len(elements)
-            except Exception:
-                continue
-        # If none found, try waiting for any item and then re-count
+        # The first probe returns immediately if items are already rendered;
+        # otherwise keep probing (one call per poll) until some locator matches
         try:
-            self.wait_for_visible(self.PRODUCT_GRID_ITEMS_LOCATORS[0])
-            elements = self.driver.find_elements(*self.PRODUCT_GRID_ITEMS_LOCATORS[0])
-            return len(elements)
+            hit = self.wait_for_probe(self.PRODUCT_GRID_ITEMS_LOCATORS, lambda r: r["count"] > 0, ranked=False)
+            return hit["count"]
         except Exception:
             return 0
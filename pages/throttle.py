@@ -0,0 +1,172 @@
+import json
+import os
+import random
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+
+from .file_lock import file_lock
+
+
+DEFAULT_STATE_PATH = os.path.join(".cache", "throttle.json")
+
+# Devuelve la señal de bloqueo encontrada en la página actual (o null). El sitio responde a
+# los navegadores automatizados con la página "Access Denied" de Akamai.
+BLOCK_PAGE_SCRIPT = """
+var title = (document.title || '').toLowerCase();
+var text = document.body ? (document.body.innerText || '').slice(0, 2000).toLowerCase() : '';
+var markers = ['access denied', 'request unsuccessful', 'acceso denegado', 'pardon our interruption'];
+for (var i = 0; i < markers.length; i++) {
+    if (title.indexOf(markers[i]) !== -1) { return markers[i]; }
+}
+if (text.indexOf("you don't have permission to access") !== -1) { return 'access denied'; }
+if (/reference\\s+#\\d+\\.[0-9a-f]+/.test(text) && text.length < 1000) { return 'akamai reference'; }
+return null;
+"""
+
+
+class BlockedError(RuntimeError):
+    """El sitio sigue mostrando la página de bloqueo después de todos los reintentos."""
+
+
+class TokenBucket:
+    """Token bucket compartido por todos los procesos que usen el mismo fichero de estado.
+
+    El estado (tokens disponibles, última recarga, pausa global y métricas) vive en un JSON
+    protegido por un lock de fichero, así los workers de support.parallel_runner o del
+    crawler se reparten el mismo ritmo de peticiones en lugar de tener uno cada uno.
+    """
+
+    def __init__(self, path: str = DEFAULT_STATE_PATH, rate_per_minute: float = 30, burst: int = 3):
+        self.path = path
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+
+    @contextmanager
+    def state(self):
+        """Estado compartido bajo el lock; lo que se modifique dentro se guarda al salir."""
+        with file_lock(self.path + ".lock"):
+            try:
+                with open(self.path, encoding="utf-8") as handle:
+                    state = json.load(handle)
+            except (OSError, ValueError):
+                state = {}
+            state.setdefault("tokens", float(self.burst))
+            state.setdefault("updated", time.time())
+            state.setdefault("paused_until", 0.0)
+            state.setdefault("metrics", {})
+            yield state
+            with open(self.path, "w", encoding="utf-8") as handle:
+                json.dump(state, handle)
+
+    def acquire(self) -> float:
+        """Bloquea hasta conseguir un token; devuelve los segundos de espera."""
+        started = time.monotonic()
+        while True:
+            with self.state() as state:
+                now = time.time()
+                state["tokens"] = min(self.burst, state["tokens"] + (now - state["updated"]) * self.rate)
+                state["updated"] = now
+                if now >= state["paused_until"] and state["tokens"] >= 1:
+                    state["tokens"] -= 1
+                    return time.monotonic() - started
+                wait = max(state["paused_until"] - now, (1 - state["tokens"]) / self.rate)
+            time.sleep(min(wait, 5.0))
+
+    def pause(self, seconds: float):
+        """Detiene a todos los workers durante `seconds` (y vacía el bucket)."""
+        with self.state() as state:
+            state["paused_until"] = max(state["paused_until"], time.time() + seconds)
+            state["tokens"] = 0.0
+
+    def count(self, **increments):
+        with self.state() as state:
+            metrics = state["metrics"]
+            metrics.setdefault("since", time.time())
+            for name, value in increments.items():
+                metrics[name] = metrics.get(name, 0) + value
+
+    def reset_metrics(self):
+        with self.state() as state:
+            state["metrics"] = {}
+
+
+class Scheduler:
+    """Ritmo de navegación común y reintentos con backoff exponencial ante la página de bloqueo.
+
+    run() pide un token antes de cada intento; si tras la acción la página es la de bloqueo,
+    pausa a todos los workers con un retardo exponencial con jitter, ejecuta `recover` (por
+    ejemplo volver a la home) y repite. Tras max_retries intentos fallidos lanza BlockedError.
+    """
+
+    def __init__(self, bucket: TokenBucket, max_retries: int = 3, base_delay: float = 5.0, max_delay: float = 120.0):
+        self.bucket = bucket
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return random.uniform(delay / 2, delay)
+
+    @staticmethod
+    def detect_block(driver):
+        try:
+            return driver.execute_script(BLOCK_PAGE_SCRIPT)
+        except WebDriverException:
+            return None
+
+    def run(self, driver, action, recover=None):
+        for attempt in range(self.max_retries + 1):
+            if attempt and recover is not None:
+                recover()
+            waited = self.bucket.acquire()
+            error = None
+            try:
+                result = action()
+            except Exception as e:
+                error = e
+            marker = self.detect_block(driver)
+            self.bucket.count(requests=1, blocks=1 if marker else 0, retries=1 if attempt else 0, waited_s=waited)
+            if not marker:
+                if error is not None:
+                    raise error
+                return result
+            if attempt == self.max_retries:
+                raise BlockedError(f"Blocked ({marker}) after {attempt + 1} attempts: {driver.current_url}")
+            self.bucket.pause(self.backoff(attempt))
+
+    def metrics(self) -> dict:
+        """Métricas acumuladas por todos los workers desde el último reset_metrics()."""
+        with self.bucket.state() as state:
+            metrics = dict(state["metrics"])
+        elapsed = time.time() - metrics.get("since", time.time())
+        requests = metrics.get("requests", 0)
+        ok = requests - metrics.get("blocks", 0)
+        return {
+            "requests": requests,
+            "blocks": metrics.get("blocks", 0),
+            "retries": metrics.get("retries", 0),
+            "waited_s": round(metrics.get("waited_s", 0.0), 1),
+            "elapsed_s": round(elapsed, 1),
+            "ok_per_minute": round(ok / elapsed * 60, 1) if elapsed > 0 else 0.0,
+            "block_rate": round(metrics.get("blocks", 0) / requests, 3) if requests else 0.0,
+        }
+
+
+def shared_scheduler():
+    """Scheduler común configurado por entorno, o None si no se ha definido THROTTLE_RATE.
+
+    THROTTLE_RATE: navegaciones por minuto entre todos los workers.
+    THROTTLE_BURST, THROTTLE_RETRIES y THROTTLE_STATE (fichero de estado compartido).
+    """
+    rate = os.environ.get("THROTTLE_RATE")
+    if not rate:
+        return None
+    bucket = TokenBucket(
+        os.environ.get("THROTTLE_STATE", DEFAULT_STATE_PATH),
+        float(rate),
+        int(os.environ.get("THROTTLE_BURST", "3")),
+    )
+    return Scheduler(bucket, max_retries=int(os.environ.get("THROTTLE_RETRIES", "3")))
@@ -0,0 +1,209 @@
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .locator_specs import LOCATOR_JS, probe_spec
+
+
+# Modo de espera equivalente a cada condición de expected_conditions
+CONDITION_MODES = {
+    EC.presence_of_element_located: "present",
+    EC.visibility_of_element_located: "visible",
+    EC.element_to_be_clickable: "clickable",
+}
+
+# Resuelve en cuanto algún localizador cumple el modo pedido ('present', 'visible' o
+# 'clickable'), revisando tras cada lote de mutaciones del DOM. Devuelve [índice, elemento]
+# o null si vence el timeout. El intervalo de respaldo cubre cambios de visibilidad por CSS
+# que no generan mutaciones.
+OBSERVER_SCRIPT = LOCATOR_JS + """
+var specs = arguments[0], mode = arguments[1], timeoutMs = arguments[2];
+var done = arguments[arguments.length - 1];
+function matches(el) {
+    if (mode === 'present') { return true; }
+    if (!isVisible(el)) { return false; }
+    return mode === 'visible' || !el.disabled;
+}
+function check() {
+    for (var i = 0; i < specs.length; i++) {
+        var nodes;
+        try { nodes = findAll(specs[i]); } catch (e) { continue; }
+        for (var j = 0; j < nodes.length; j++) {
+            if (matches(nodes[j])) { return [i, nodes[j]]; }
+        }
+    }
+    return null;
+}
+var hit = check();
+if (hit) { done(hit); return; }
+var finished = false, scheduled = false, observer, interval, timer;
+function finish(value) {
+    if (finished) { return; }
+    finished = true;
+    observer.disconnect();
+    clearInterval(interval);
+    clearTimeout(timer);
+    done(value);
+}
+function recheck() {
+    scheduled = false;
+    var found = check();
+    if (found) { finish(found); }
+}
+observer = new MutationObserver(function () {
+    if (!scheduled) { scheduled = true; setTimeout(recheck, 0); }
+});
+observer.observe(document, {childList: true, subtree: true, attributes: true});
+interval = setInterval(recheck, 100);
+timer = setTimeout(function () { finish(null); }, timeoutMs);
+"""
+
+# Resuelve cuando location.href deja de ser arguments[0] (pushState, replaceState, popstate,
+# hashchange) o al vencer el timeout. Una navegación completa destruye el contexto y hace
+# fallar el script, lo que también sirve de aviso.
+URL_CHANGE_SCRIPT = """
+var start = arguments[0], timeoutMs = arguments[1];
+var done = arguments[arguments.length - 1];
+if (location.href !== start) { done(location.href); return; }
+var finished = false, interval, timer;
+function finish() {
+    if (finished) { return; }
+    finished = true;
+    clearInterval(interval);
+    clearTimeout(timer);
+    window.removeEventListener('popstate', check);
+    window.removeEventListener('hashchange', check);
+    window.removeEventListener('pom:locationchange', check);
+    done(location.href);
+}
+function check() { if (location.href !== start) { finish(); } }
+// pushState/replaceState se envuelven una sola vez por documento y avisan con un evento
+if (!window.__pomHistoryPatched) {
+    window.__pomHistoryPatched = true;
+    ['pushState', 'replaceState'].forEach(function (name) {
+        var original = history[name];
+        history[name] = function () {
+            var result = original.apply(this, arguments);
+            setTimeout(function () { window.dispatchEvent(new Event('pom:locationchange')); }, 0);
+            return result;
+        };
+    });
+}
+window.addEventListener('popstate', check);
+window.addEventListener('hashchange', check);
+window.addEventListener('pom:locationchange', check);
+interval = setInterval(check, 50);
+timer = setTimeout(finish, timeoutMs);
+"""
+
+
+class PollingWaits:
+    """Esperas clásicas de Selenium: WebDriverWait comprobando cada 0.5 s."""
+
+    name = "polling"
+
+    def __init__(self, driver, timeout: float):
+        self.driver = driver
+        self.timeout = timeout
+
+    def _wait(self, timeout):
+        return WebDriverWait(self.driver, self.timeout if timeout is None else timeout)
+
+    def until_any(self, locators, mode: str = "visible", timeout=None):
+        """Devuelve (elemento, índice) del primer localizador que cumple el modo."""
+        condition = {value: key for key, value in CONDITION_MODES.items()}[mode]
+        checks = [condition(locator) for locator in locators]
+
+        def first_match(driver):
+            for index, check in enumerate(checks):
+                try:
+                    element = check(driver)
+                except WebDriverException:
+                    continue
+                if element:
+                    return element, index
+            return False
+
+        return self._wait(timeout).until(first_match, f"None of {len(checks)} locators is {mode}")
+
+    def until_url(self, predicate, timeout=None):
+        """Espera a que predicate(url_actual) sea cierto y devuelve la URL."""
+        return self._wait(timeout).until(
+            lambda d: d.current_url if predicate(d.current_url) else False, "URL condition not met"
+        )
+
+
+class ObserverWaits(PollingWaits):
+    """Esperas por eventos: un MutationObserver dentro de la página resuelve la llamada
+    asíncrona en cuanto aparece el nodo, sin esperar al siguiente ciclo de sondeo.
+    """
+
+    name = "observer"
+
+    @contextmanager
+    def _script_timeout(self):
+        # set_script_timeout afecta a toda la sesión: dejar el valor anterior al terminar,
+        # para que no pase a los tests siguientes en las sesiones del pool
+        try:
+            previous = self.driver.timeouts.script
+        except (AttributeError, WebDriverException):
+            previous = None
+        try:
+            yield
+        finally:
+            if previous is not None:
+                try:
+                    self.driver.set_script_timeout(previous)
+                except WebDriverException:
+                    pass
+
+    def until_any(self, locators, mode: str = "visible", timeout=None):
+        specs = [probe_spec(locator) for locator in locators]
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        with self._script_timeout():
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutException(f"None of {len(specs)} locators is {mode}")
+                try:
+                    self.driver.set_script_timeout(remaining + 5)
+                    result = self.driver.execute_async_script(OBSERVER_SCRIPT, specs, mode, int(remaining * 1000))
+                except WebDriverException:
+                    # La página ha navegado durante la espera: volver a instalar el observer
+                    time.sleep(0.05)
+                    continue
+                if result:
+                    return result[1], result[0]
+
+    def until_url(self, predicate, timeout=None):
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        with self._script_timeout():
+            while True:
+                try:
+                    url = self.driver.current_url
+                except WebDriverException:
+                    url = ""
+                if url and predicate(url):
+                    return url
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutException("URL condition not met")
+                try:
+                    self.driver.set_script_timeout(remaining + 5)
+                    self.driver.execute_async_script(URL_CHANGE_SCRIPT, url, int(remaining * 1000))
+                except WebDriverException:
+                    # Navegación completa en curso; se comprueba la URL en la siguiente vuelta
+                    time.sleep(0.05)
+
+
+WAIT_ENGINES = {engine.name: engine for engine in (PollingWaits, ObserverWaits)}
+
+
+def create_wait_engine(name: str, driver, timeout: float):
+    try:
+        return WAIT_ENGINES[name](driver, timeout)
+    except KeyError:
+        raise ValueError(f"Unknown wait engine '{name}', expected one of {sorted(WAIT_ENGINES)}") from None
@@ -0,0 +1,163 @@
+"""Benchmark de los page objects contra páginas locales, con baseline y presupuesto.
+
+Uso:
+    python -m support.benchmark                      # compara con benchmarks/baseline.json
+    python -m support.benchmark --update-baseline    # guarda los resultados como nueva baseline
+
+Cada operación se repite --runs veces en dos escenarios servidos desde benchmarks/fixtures:
+"primary" (coinciden los primeros localizadores de cada lista) y "fallback" (fallan y entran
+las alternativas). Se mide p50/p95 de la operación y el número de comandos WebDriver.
+Termina con código 1 si alguna operación se sale del presupuesto respecto a la baseline y con
+código 2 si la baseline no existe (hay que crearla antes con --update-baseline).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from pages.base import BasePage
+from pages.home import HomePage
+from pages.search_results import SearchResultsPage
+from support.browser import create_chrome_driver
+from support.replay import ReplayServer, ReplayStore
+
+
+FIXTURES_DIR = os.path.join("benchmarks", "fixtures")
+BASELINE_PATH = os.path.join("benchmarks", "baseline.json")
+
+SCENARIOS = {
+    "primary": {"home": "", "results": "search-nwx/1/?s=zapatillas", "query": "zapatillas"},
+    "fallback": {"home": "fallback/", "results": "fallback/search-nwx/1/?s=zapatillas", "query": "zapatillas"},
+}
+
+# operación -> (página en la que empieza, función que se mide)
+OPERATIONS = {
+    "search": ("home", lambda home, results, scenario: home.search(scenario["query"])),
+    "results_title": ("results", lambda home, results, scenario: results.get_results_title_text()),
+    "count_products": ("results", lambda home, results, scenario: results.count_listed_products()),
+    "first_product": ("results", lambda home, results, scenario: results.click_first_product()),
+    "open_first_product": ("results", lambda home, results, scenario: results.open_first_product()),
+}
+
+
+class CommandCounter:
+    """Cuenta los comandos WebDriver que pasan por driver.execute (también los de WebElement)."""
+
+    def __init__(self, driver):
+        self.count = 0
+        original = driver.execute
+
+        def counting_execute(*args, **kwargs):
+            self.count += 1
+            return original(*args, **kwargs)
+
+        driver.execute = counting_execute
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_benchmarks(runs: int, timeout: float, fixtures_dir: str = FIXTURES_DIR) -> dict:
+    results = {}
+    with ReplayServer(ReplayStore(fixtures_dir)) as server:
+        driver = create_chrome_driver("lean", headless=True)
+        counter = CommandCounter(driver)
+        try:
+            for scenario_name, scenario in SCENARIOS.items():
+                home_url = server.base_url + scenario["home"]
+                results_url = server.base_url + scenario["results"]
+                home = HomePage(driver, timeout)
+                home.BASE_URL = home_url
+                search_results = SearchResultsPage(driver, timeout)
+                for operation_name, (start_page, operation) in OPERATIONS.items():
+                    durations, commands = [], []
+                    for _ in range(runs):
+                        # Cargar con open() como en los tests: registra el vigilante de modales y
+                        # close_modal_if_present no cae en la espera completa de MODAL_CLOSE_LOCATORS
+                        if start_page == "home":
+                            home.open(home_url)
+                        else:
+                            search_results.open(results_url)
+                        counter.count = 0
+                        started = time.perf_counter()
+                        operation(home, search_results, scenario)
+                        durations.append((time.perf_counter() - started) * 1000)
+                        commands.append(counter.count)
+                    results[f"{scenario_name}/{operation_name}"] = {
+                        "p50_ms": round(percentile(durations, 0.5), 1),
+                        "p95_ms": round(percentile(durations, 0.95), 1),
+                        "commands": max(commands),
+                    }
+        finally:
+            driver.quit()
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float, slack_ms: float, command_tolerance: float):
+    """Devuelve la lista de operaciones fuera de presupuesto con el motivo."""
+    failures = []
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        budget_ms = reference["p95_ms"] * (1 + tolerance) + slack_ms
+        if current["p95_ms"] > budget_ms:
+            failures.append(f"{name}: p95 {current['p95_ms']:.0f} ms > budget {budget_ms:.0f} ms")
+        if reference.get("commands") is None:
+            # Baseline sembrada a mano: sólo hay presupuesto de tiempo
+            continue
+        budget_commands = int(reference["commands"] * (1 + command_tolerance))
+        if current["commands"] > budget_commands:
+            failures.append(f"{name}: {current['commands']} commands > budget {budget_commands}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de los page objects con baseline")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=2, help="Timeout de los page objects (s)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Margen relativo sobre el p95")
+    parser.add_argument("--slack-ms", type=float, default=50, help="Margen absoluto sobre el p95")
+    parser.add_argument("--command-tolerance", type=float, default=0.0)
+    parser.add_argument("--with-cache", action="store_true", help="No desactivar la caché de localizadores")
+    args = parser.parse_args(argv)
+
+    if not args.with_cache:
+        # Sin ranking adaptativo: cada repetición recorre las listas en el orden declarado
+        BasePage.locator_cache = None
+
+    results = run_benchmarks(args.runs, args.timeout)
+    for name, values in results.items():
+        print(f"{name:28} p50 {values['p50_ms']:8.1f} ms  p95 {values['p95_ms']:8.1f} ms  {values['commands']:4d} commands")
+
+    try:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+    except (OSError, ValueError):
+        baseline = None
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if baseline is None:
+        # Sin baseline no hay con qué comparar: fallar para que no pase desapercibido en CI
+        print(f"No baseline at {args.baseline}; run with --update-baseline on the reference machine")
+        return 2
+
+    if baseline.get("_seeded"):
+        print("Baseline is a hand-seeded upper bound; record a real one with --update-baseline")
+    failures = compare(results, baseline, args.tolerance, args.slack_ms, args.command_tolerance)
+    for failure in failures:
+        print("OVER BUDGET", failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
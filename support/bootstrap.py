@@ -0,0 +1,156 @@
+"""Resolución de chromedriver una sola vez, con caché en disco y sin depender de la red.
+
+Orden de resolución:
+    1. CHROMEDRIVER_PATH, si está definida.
+    2. La ruta guardada en .cache/chromedriver.json (o CHROMEDRIVER_CACHE), si el binario sigue existiendo.
+    3. webdriver-manager (necesita red; se salta con OFFLINE=1).
+    4. Un chromedriver del PATH.
+    5. Selenium Manager (Service() sin ruta), que también funciona con binarios locales.
+
+Si la sesión no se puede crear con el chromedriver de la caché (normalmente porque Chrome se
+ha actualizado), create_chrome_driver vuelve a resolverlo una vez con refresh=True.
+
+Para medir el arranque en frío (sin caché) y en caliente:
+    python -m support.bootstrap --report
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import time
+
+from selenium.webdriver.chrome.service import Service
+
+
+CACHE_PATH = os.environ.get("CHROMEDRIVER_CACHE", os.path.join(".cache", "chromedriver.json"))
+
+_RESOLVED = None
+
+
+def offline() -> bool:
+    return os.environ.get("OFFLINE", "").lower() in ("1", "true", "yes")
+
+
+def chromedriver_version(path: str) -> str:
+    try:
+        output = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    parts = output.split()
+    return parts[1] if len(parts) > 1 else output.strip()
+
+
+def load_cached(cache_path: str = CACHE_PATH):
+    try:
+        with open(cache_path, encoding="utf-8") as handle:
+            entry = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if entry.get("path") and os.path.isfile(entry["path"]):
+        return dict(entry, source="cache")
+    return None
+
+
+def save_cached(entry: dict, cache_path: str = CACHE_PATH):
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    with open(cache_path, "w", encoding="utf-8") as handle:
+        json.dump({key: entry[key] for key in ("path", "version", "resolved_at", "resolved_by")}, handle, indent=2)
+
+
+def _resolve_fresh() -> dict:
+    path, source = None, "selenium-manager"
+    if not offline():
+        try:
+            from webdriver_manager.chrome import ChromeDriverManager
+            path, source = ChromeDriverManager().install(), "webdriver-manager"
+        except Exception:
+            path = None
+    if path is None and shutil.which("chromedriver"):
+        path, source = shutil.which("chromedriver"), "path"
+    return {
+        "path": path,
+        "version": chromedriver_version(path) if path else "",
+        "resolved_at": time.time(),
+        "resolved_by": source,
+        "source": source,
+    }
+
+
+def resolve_chromedriver(refresh: bool = False, cache_path: str = CACHE_PATH) -> dict:
+    """Devuelve {path, version, source, ...}; path es None si lo resolverá Selenium Manager."""
+    global _RESOLVED
+    if _RESOLVED is not None and not refresh:
+        return _RESOLVED
+    if os.environ.get("CHROMEDRIVER_PATH"):
+        path = os.environ["CHROMEDRIVER_PATH"]
+        _RESOLVED = {"path": path, "version": chromedriver_version(path), "resolved_at": time.time(),
+                     "resolved_by": "env", "source": "env"}
+        return _RESOLVED
+    entry = None if refresh else load_cached(cache_path)
+    if entry is None:
+        entry = _resolve_fresh()
+        if entry["path"]:
+            save_cached(entry, cache_path)
+    _RESOLVED = entry
+    return entry
+
+
+def chrome_service() -> Service:
+    """Service nuevo (uno por driver) apuntando al chromedriver ya resuelto."""
+    path = resolve_chromedriver()["path"]
+    return Service(path) if path else Service()
+
+
+def remember_driver(driver, cache_path: str = CACHE_PATH):
+    """Si la ruta la resolvió Selenium Manager al arrancar, guardarla para la próxima vez."""
+    global _RESOLVED
+    entry = resolve_chromedriver()
+    path = getattr(getattr(driver, "service", None), "path", None)
+    if entry["path"] is None and path and os.path.isfile(path):
+        _RESOLVED = {"path": path, "version": chromedriver_version(path), "resolved_at": time.time(),
+                     "resolved_by": "selenium-manager", "source": "selenium-manager"}
+        save_cached(_RESOLVED, cache_path)
+
+
+def time_to_first_get(refresh: bool) -> dict:
+    from support.browser import create_chrome_driver
+
+    global _RESOLVED
+    _RESOLVED = None
+    started = time.perf_counter()
+    entry = resolve_chromedriver(refresh=refresh)
+    resolved = time.perf_counter()
+    driver = create_chrome_driver(headless=True)
+    launched = time.perf_counter()
+    try:
+        driver.get("about:blank")
+    finally:
+        first_get = time.perf_counter()
+        driver.quit()
+    return {
+        "source": entry["source"],
+        "version": entry["version"],
+        "resolve_ms": (resolved - started) * 1000,
+        "launch_ms": (launched - resolved) * 1000,
+        "first_get_ms": (first_get - started) * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resuelve y cachea chromedriver")
+    parser.add_argument("--refresh", action="store_true", help="Ignorar la caché y volver a resolver")
+    parser.add_argument("--report", action="store_true", help="Medir arranque en frío y en caliente")
+    args = parser.parse_args(argv)
+
+    if not args.report:
+        print(json.dumps(resolve_chromedriver(refresh=args.refresh), indent=2))
+        return
+    for label, refresh in (("cold", True), ("warm", False)):
+        stats = time_to_first_get(refresh)
+        print(f"{label:5} {stats['source']:17} {stats['version']:16} resolve {stats['resolve_ms']:8.0f} ms  "
+              f"launch {stats['launch_ms']:8.0f} ms  first get {stats['first_get_ms']:8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
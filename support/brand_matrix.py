@@ -0,0 +1,36 @@
+"""Número de productos de una búsqueda filtrando por cada marca, sobre una sola carga de resultados.
+
+Uso: python -m support.brand_matrix zapatillas Nike Adidas Puma [--mode url] [--json matrix.json]
+"""
+import argparse
+import json
+
+from pages.search_results import SearchResultsPage, format_filter_matrix
+from support.browser import create_chrome_driver, headless_from_env
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("query")
+    parser.add_argument("brands", nargs="+")
+    parser.add_argument("--mode", choices=("ui", "url"), default="ui",
+                        help="Marcar cada marca en el desplegable (ui) o navegar a la URL filtrada (url)")
+    parser.add_argument("--settle-timeout", type=float, default=5.0)
+    parser.add_argument("--profile", default="default")
+    parser.add_argument("--json", help="Guardar las filas en este fichero")
+    args = parser.parse_args(argv)
+
+    driver = create_chrome_driver(args.profile, headless_from_env())
+    try:
+        rows = SearchResultsPage(driver).brand_filter_matrix(args.query, args.brands, args.mode, args.settle_timeout)
+    finally:
+        driver.quit()
+
+    print(format_filter_matrix(rows))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(rows, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
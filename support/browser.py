@@ -0,0 +1,164 @@
+"""Creación de sesiones de Chrome y perfiles de navegador.
+
+Perfiles disponibles:
+    default: navegador completo, como pide el enunciado.
+    lean:    bloquea imágenes, fuentes, vídeo y analítica por CDP (Network.setBlockedURLs)
+             y usa la estrategia de carga "eager"; basta para los flujos que sólo leen el DOM.
+
+HEADLESS=1 arranca cualquiera de los dos sin ventana. Para medir lo que ahorra el perfil lean:
+    python -m support.browser --compare https://www.elcorteingles.es/
+"""
+import argparse
+import os
+import time
+from functools import lru_cache
+
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException
+from selenium.webdriver.chrome.options import Options
+
+from support.bootstrap import chrome_service, remember_driver, resolve_chromedriver
+
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36"
+
+PROFILES = ("default", "lean")
+
+# Recursos pesados y dominios de analítica que el perfil lean no descarga
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*criteo.com*",
+    "*criteo.net*", "*tiktok.com*", "*pinterest.com*", "*bing.com*",
+    "*adobedtm.com*", "*omtrdc.net*", "*demdex.net*", "*clarity.ms*",
+]
+
+# Peso transferido y tiempos de la navegación actual según la Resource Timing API
+PAGE_WEIGHT_SCRIPT = """
+var nav = performance.getEntriesByType('navigation')[0] || {};
+var resources = performance.getEntriesByType('resource');
+var bytes = nav.transferSize || 0;
+for (var i = 0; i < resources.length; i++) { bytes += resources[i].transferSize || 0; }
+return {
+    bytes: bytes,
+    requests: resources.length + 1,
+    dom_content_loaded_ms: nav.domContentLoadedEventEnd || 0,
+    load_ms: nav.loadEventEnd || 0
+};
+"""
+
+
+def headless_from_env() -> bool:
+    return os.environ.get("HEADLESS", "").lower() in ("1", "true", "yes")
+
+
+def build_chrome_options(profile: str = "default", headless: bool = None, extra_arguments=(),
+                         page_load_strategy: str = None) -> Options:
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown browser profile '{profile}', expected one of {PROFILES}")
+    options = Options()
+    # Anti-automation configuration provided in the brief
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    options.add_argument(f"user-agent={USER_AGENT}")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+
+    # Recommended additional stability options
+    options.add_argument("--start-maximized")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+
+    if headless if headless is not None else headless_from_env():
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1920,1080")
+
+    if profile == "lean":
+        # No esperar a subrecursos: driver.get vuelve en DOMContentLoaded
+        options.page_load_strategy = "eager"
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+    for argument in extra_arguments:
+        options.add_argument(argument)
+    if page_load_strategy:
+        options.page_load_strategy = page_load_strategy
+    return options
+
+
+@lru_cache(maxsize=None)
+def cached_chrome_options(profile: str = "default", headless: bool = None, extra_arguments=(),
+                          page_load_strategy: str = None) -> Options:
+    """Options construidas una sola vez por combinación de parámetros (no modificarlas)."""
+    return build_chrome_options(profile, headless, extra_arguments, page_load_strategy)
+
+
+def apply_resource_blocking(driver, patterns=BLOCKED_URL_PATTERNS):
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+
+
+def create_chrome_driver(profile: str = "default", headless: bool = None, extra_arguments=(),
+                         page_load_strategy: str = None):
+    if headless is None:
+        headless = headless_from_env()
+    options = cached_chrome_options(profile, headless, tuple(extra_arguments), page_load_strategy)
+    try:
+        driver = webdriver.Chrome(service=chrome_service(), options=options)
+    except SessionNotCreatedException:
+        # Lo habitual es que Chrome se haya actualizado y el chromedriver de la caché ya no
+        # le corresponda: resolverlo de nuevo una vez (la caché se reescribe)
+        if resolve_chromedriver()["source"] != "cache":
+            raise
+        resolve_chromedriver(refresh=True)
+        driver = webdriver.Chrome(service=chrome_service(), options=options)
+    remember_driver(driver)
+    if profile == "lean":
+        apply_resource_blocking(driver)
+    return driver
+
+
+def page_weight(driver) -> dict:
+    return driver.execute_script(PAGE_WEIGHT_SCRIPT)
+
+
+def compare_profiles(url: str, runs: int = 3, headless: bool = None):
+    """Carga `url` con cada perfil y devuelve la media de bytes transferidos y tiempos."""
+    summary = {}
+    for profile in PROFILES:
+        driver = create_chrome_driver(profile, headless)
+        samples = []
+        try:
+            for _ in range(runs):
+                driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+                started = time.perf_counter()
+                driver.get(url)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                weight = page_weight(driver)
+                weight["get_ms"] = elapsed_ms
+                samples.append(weight)
+        finally:
+            driver.quit()
+        summary[profile] = {key: sum(s[key] for s in samples) / len(samples) for key in samples[0]}
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara el perfil default con el perfil lean")
+    parser.add_argument("--compare", metavar="URL", required=True)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--headless", action="store_true")
+    args = parser.parse_args(argv)
+
+    summary = compare_profiles(args.compare, args.runs, args.headless or None)
+    default, lean = summary["default"], summary["lean"]
+    for profile, values in summary.items():
+        print(f"{profile:8} {values['bytes'] / 1024:10.0f} KiB {values['requests']:6.0f} requests "
+              f"{values['get_ms']:8.0f} ms driver.get")
+    print(f"saved    {(default['bytes'] - lean['bytes']) / 1024:10.0f} KiB "
+          f"{default['requests'] - lean['requests']:6.0f} requests "
+          f"{default['get_ms'] - lean['get_ms']:8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Comprueba en paralelo las fichas de detalle de los primeros resultados de varias búsquedas.
+
+Uso: python -m support.crawler zapatillas bolsos --top 10 --concurrency 3 [--json crawl.json]
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from itertools import islice
+
+from pages.product_detail import ProductDetailPage
+from pages.search_results import SearchResultsPage
+from support.browser import create_chrome_driver, headless_from_env
+from support.driver_pool import DriverPool
+
+
+def harvest_hrefs(driver, query: str, top: int):
+    """Enlaces a las fichas de los `top` primeros productos de una búsqueda."""
+    results = SearchResultsPage(driver)
+    results.open_for_query(query)
+    return [item["href"] for item in islice(results.iter_products(limit=top), top) if item["href"]]
+
+
+class DetailCrawler:
+    """Reparte URLs de detalle entre las sesiones de un DriverPool.
+
+    Como mucho hay `concurrency` páginas cargándose a la vez y `max_pending` URLs enviadas
+    sin terminar; mientras tanto el iterable de entrada no se sigue consumiendo, así que
+    puede ser un generador arbitrariamente largo.
+    """
+
+    def __init__(self, pool: DriverPool, concurrency: int = None, max_pending: int = None, timeout: int = 10):
+        self.pool = pool
+        self.concurrency = concurrency or pool.size
+        self.max_pending = max_pending or self.concurrency * 2
+        self.timeout = timeout
+
+    def check(self, href: str) -> dict:
+        started = time.perf_counter()
+        try:
+            with self.pool.lease() as driver:
+                page = ProductDetailPage(driver, self.timeout)
+                page.open(href)
+                status = "ok" if page.is_on_product_detail() else "not_detail"
+                error = ""
+        except Exception as e:
+            status, error = "error", str(e).splitlines()[0] if str(e) else type(e).__name__
+        return {"url": href, "status": status, "latency_s": round(time.perf_counter() - started, 3), "error": error}
+
+    def crawl(self, hrefs):
+        """Genera el resultado de cada URL según van terminando."""
+        slots = threading.BoundedSemaphore(self.max_pending)
+
+        def task(href):
+            try:
+                return self.check(href)
+            finally:
+                slots.release()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = set()
+            for href in hrefs:
+                # Backpressure: no leer más URLs mientras haya max_pending en curso
+                slots.acquire()
+                futures.add(executor.submit(task, href))
+                done = {future for future in futures if future.done()}
+                for future in done:
+                    yield future.result()
+                futures -= done
+            for future in as_completed(futures):
+                yield future.result()
+
+
+def summarize(results, elapsed: float) -> dict:
+    latencies = sorted(result["latency_s"] for result in results)
+    by_status = {}
+    for result in results:
+        by_status[result["status"]] = by_status.get(result["status"], 0) + 1
+    return {
+        "pages": len(results),
+        "by_status": by_status,
+        "elapsed_s": round(elapsed, 2),
+        "pages_per_minute": round(len(results) / elapsed * 60, 1) if elapsed else 0.0,
+        "p50_latency_s": latencies[len(latencies) // 2] if latencies else 0.0,
+        "p95_latency_s": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("queries", nargs="+")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=3)
+    parser.add_argument("--max-pending", type=int)
+    parser.add_argument("--profile", default="lean")
+    parser.add_argument("--json", help="Guardar el resultado por URL en este fichero")
+    args = parser.parse_args(argv)
+
+    pool = DriverPool(partial(create_chrome_driver, args.profile, headless_from_env()), size=args.concurrency)
+    try:
+        hrefs = []
+        with pool.lease() as driver:
+            for query in args.queries:
+                hrefs.extend(harvest_hrefs(driver, query, args.top))
+        pool.prewarm()
+
+        crawler = DetailCrawler(pool, args.concurrency, args.max_pending)
+        started = time.perf_counter()
+        results = []
+        for result in crawler.crawl(hrefs):
+            results.append(result)
+            print(f"{result['status']:10} {result['latency_s']:6.2f}s {result['url']} {result['error']}")
+        summary = summarize(results, time.perf_counter() - started)
+    finally:
+        pool.close()
+
+    print(json.dumps(summary, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump({"summary": summary, "results": results}, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+
+
+class DriverPool:
+    """Pool de sesiones de Chrome ya arrancadas que se prestan a cada test.
+
+    Entre préstamos cada sesión se limpia (ventanas extra, cookies, storage y about:blank)
+    para que los tests sigan siendo independientes. Las sesiones que dejan de responder se
+    descartan y se sustituyen por otras nuevas en el siguiente acquire().
+    """
+
+    # Segundos que acquire() espera por una sesión libre antes de fallar
+    ACQUIRE_TIMEOUT = 300
+
+    def __init__(self, factory, size: int = 1, max_uses: int = None):
+        self.factory = factory
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        # LIFO: se reutiliza primero la sesión más reciente (la más "caliente")
+        self._idle = queue.LifoQueue()
+        self._uses = {}
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, factory):
+        return cls(
+            factory,
+            size=int(os.environ.get("DRIVER_POOL_SIZE", "1")),
+            max_uses=int(os.environ["DRIVER_POOL_MAX_USES"]) if os.environ.get("DRIVER_POOL_MAX_USES") else None,
+        )
+
+    def acquire(self, timeout: float = ACQUIRE_TIMEOUT):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                driver = self._create_if_allowed()
+                if driver is None:
+                    # Pool lleno: esperar a que se devuelva alguna sesión
+                    try:
+                        driver = self._idle.get(timeout=timeout)
+                    except queue.Empty:
+                        raise TimeoutError(f"No driver released to the pool within {timeout}s") from None
+            if self.is_healthy(driver):
+                return driver
+            self._discard(driver)
+
+    def release(self, driver):
+        self._uses[driver] = self._uses.get(driver, 0) + 1
+        if self.max_uses and self._uses[driver] >= self.max_uses:
+            self._discard(driver)
+            return
+        try:
+            self.reset(driver)
+        except Exception:
+            self._discard(driver)
+            return
+        self._idle.put(driver)
+
+    @contextmanager
+    def lease(self):
+        driver = self.acquire()
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def prewarm(self, count: int = None):
+        """Arranca por adelantado hasta `count` sesiones (por defecto, el tamaño del pool)."""
+        for _ in range(min(count or self.size, self.size)):
+            driver = self._create_if_allowed()
+            if driver is None:
+                break
+            self._idle.put(driver)
+
+    def close(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+    @staticmethod
+    def is_healthy(driver) -> bool:
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def reset(driver):
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        if handles:
+            driver.switch_to.window(handles[0])
+        else:
+            # El test ha cerrado su ventana; si no se puede abrir otra, release() la descarta
+            driver.switch_to.new_window("tab")
+
+        # Borrar el storage del origen actual antes de salir de él
+        try:
+            driver.execute_script("try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}")
+        except WebDriverException:
+            pass
+        origin = driver.execute_script("return window.location.origin;")
+        try:
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            if origin and origin != "null":
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+        except (AttributeError, WebDriverException):
+            # Navegador sin CDP: al menos las cookies del dominio actual
+            driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    def _create_if_allowed(self):
+        with self._lock:
+            if self._created >= self.size:
+                return None
+            self._created += 1
+        try:
+            return self.factory()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _discard(self, driver):
+        self._uses.pop(driver, None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._lock:
+            self._created -= 1
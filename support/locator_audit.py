@@ -0,0 +1,165 @@
+"""Auditoría de localizadores sin navegador, contra páginas HTML guardadas.
+
+Uso:
+    python -m support.locator_audit recordings benchmarks/fixtures [--workers 8] [--json audit.json]
+
+Reúne todas las tablas de localizadores de los page objects (atributos de clase que son listas
+de (By, selector), incluida BasePage.MODAL_CLOSE_LOCATORS), parsea cada snapshot una sola vez
+y evalúa todos los CSS y XPath sobre él, repartiendo los snapshots en un pool de procesos.
+Informa de en cuántos snapshots coincide cada localizador, cuántos nodos encuentra en total y
+cuáles no coinciden en ninguno. Sin navegador no hay visibilidad: sólo se cuentan nodos.
+
+Necesita lxml y cssselect (pip install lxml cssselect).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import lxml.html
+    from lxml import etree
+    from lxml.cssselect import CSSSelector
+except ImportError:
+    lxml = None
+
+from pages.base import BasePage, probe_spec
+from pages.home import HomePage
+from pages.product_detail import ProductDetailPage
+from pages.search_results import SearchResultsPage
+
+
+PAGE_CLASSES = [BasePage, HomePage, SearchResultsPage, ProductDetailPage]
+
+SNAPSHOT_EXTENSIONS = (".html", ".htm")
+
+
+def collect_locators(classes=PAGE_CLASSES):
+    """[(tabla, índice, tipo, selector)] de cada lista de localizadores definida en las clases.
+
+    Las tablas heredadas (por ejemplo MODAL_CLOSE_LOCATORS) sólo se cuentan en la clase que las define.
+    """
+    locators = []
+    for cls in classes:
+        for name, value in vars(cls).items():
+            if not (name.isupper() and isinstance(value, list) and value):
+                continue
+            if not all(isinstance(item, tuple) and len(item) == 2 and isinstance(item[1], str) for item in value):
+                continue
+            for index, locator in enumerate(value):
+                kind, selector = probe_spec(locator)
+                locators.append((f"{cls.__name__}.{name}", index, kind, selector))
+    return locators
+
+
+def find_snapshots(paths):
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+        for root, _, files in os.walk(path):
+            for filename in sorted(files):
+                if filename.lower().endswith(SNAPSHOT_EXTENSIONS):
+                    yield os.path.join(root, filename)
+
+
+# Selectores compilados una vez por proceso del pool
+_COMPILED = None
+
+
+def _compile(locators):
+    global _COMPILED
+    _COMPILED = []
+    for _, _, kind, selector in locators:
+        try:
+            if kind == "xpath":
+                _COMPILED.append((etree.XPath(selector), None))
+            else:
+                _COMPILED.append((CSSSelector(selector, translator="html"), None))
+        except Exception as e:
+            _COMPILED.append((None, f"{type(e).__name__}: {e}"))
+
+
+def audit_snapshot(path: str):
+    """Número de nodos de cada localizador en un snapshot (None si no se ha podido evaluar)."""
+    try:
+        with open(path, "rb") as handle:
+            document = lxml.html.fromstring(handle.read())
+    except (OSError, etree.ParserError) as e:
+        return path, None, str(e)
+    counts = []
+    for compiled, _ in _COMPILED:
+        if compiled is None:
+            counts.append(None)
+            continue
+        try:
+            result = compiled(document)
+            counts.append(len(result) if isinstance(result, list) else int(bool(result)))
+        except Exception:
+            counts.append(None)
+    return path, counts, ""
+
+
+def run_audit(paths, locators, workers: int = None):
+    snapshots = list(find_snapshots(paths))
+    _compile(locators)
+    stats = [
+        {"table": table, "index": index, "kind": kind, "selector": selector, "error": error,
+         "snapshots": 0, "nodes": 0}
+        for (table, index, kind, selector), (_, error) in zip(locators, _COMPILED)
+    ]
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_compile, initargs=(locators,)) as executor:
+        chunksize = max(1, len(snapshots) // ((workers or os.cpu_count() or 1) * 4))
+        for path, counts, error in executor.map(audit_snapshot, snapshots, chunksize=chunksize):
+            if counts is None:
+                failed.append({"snapshot": path, "error": error})
+                continue
+            for item, count in zip(stats, counts):
+                if count is None:
+                    item["error"] = item["error"] or "evaluation failed"
+                elif count:
+                    item["snapshots"] += 1
+                    item["nodes"] += count
+    return {
+        "snapshots": len(snapshots) - len(failed),
+        "unreadable": failed,
+        "locators": stats,
+        "dead": [item for item in stats if not item["snapshots"]],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evalúa los localizadores de los page objects sobre snapshots HTML")
+    parser.add_argument("paths", nargs="+", help="Ficheros HTML o directorios con snapshots")
+    parser.add_argument("--workers", type=int, help="Procesos del pool (por defecto, uno por CPU)")
+    parser.add_argument("--json", help="Guardar el resultado completo en este fichero")
+    parser.add_argument("--fail-on-dead", action="store_true", help="Terminar con código 1 si hay localizadores muertos")
+    args = parser.parse_args(argv)
+
+    if lxml is None:
+        parser.error("lxml and cssselect are required: pip install lxml cssselect")
+
+    started = time.perf_counter()
+    report = run_audit(args.paths, collect_locators(), args.workers)
+    elapsed = time.perf_counter() - started
+
+    for item in report["locators"]:
+        status = "ERROR" if item["error"] else ("dead" if not item["snapshots"] else "ok")
+        print(f"{status:5} {item['table'] + '[' + str(item['index']) + ']':56} "
+              f"{item['snapshots']:5d}/{report['snapshots']:<5d} {item['nodes']:7d} nodes  {item['selector'][:70]}")
+    for item in report["unreadable"]:
+        print(f"unreadable snapshot {item['snapshot']}: {item['error']}")
+    print(f"\n{len(report['locators'])} locators, {report['snapshots']} snapshots, "
+          f"{len(report['dead'])} dead, {elapsed:.2f}s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    return 1 if args.fail_on_dead and report["dead"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
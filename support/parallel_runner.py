@@ -0,0 +1,182 @@
+"""Ejecuta los tests repartidos entre varios procesos, con un Chrome por proceso.
+
+Uso: python -m support.parallel_runner --workers 4 [tests.test ...]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from pages.base import BasePage
+from pages.throttle import shared_scheduler
+
+
+def iter_test_ids(suite):
+    for item in suite:
+        if isinstance(item, unittest.TestSuite):
+            yield from iter_test_ids(item)
+        else:
+            yield item.id()
+
+
+class RecordingResult(unittest.TestResult):
+    """TestResult que guarda cada resultado como un diccionario serializable entre procesos."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self._started = {}
+
+    def startTest(self, test):
+        super().startTest(test)
+        self._started[test.id()] = time.perf_counter()
+
+    def _record(self, test, outcome, details=""):
+        started = self._started.get(test.id(), time.perf_counter())
+        self.records.append({
+            "id": test.id(),
+            "description": str(test),
+            "outcome": outcome,
+            "details": details,
+            "duration": time.perf_counter() - started,
+        })
+
+    def addSuccess(self, test):
+        super().addSuccess(test)
+        self._record(test, "ok")
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self._record(test, "failure", self.failures[-1][1])
+
+    def addError(self, test, err):
+        super().addError(test, err)
+        self._record(test, "error", self.errors[-1][1])
+
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        self._record(test, "skip", reason)
+
+    def addExpectedFailure(self, test, err):
+        super().addExpectedFailure(test, err)
+        self._record(test, "expected failure")
+
+    def addUnexpectedSuccess(self, test):
+        super().addUnexpectedSuccess(test)
+        self._record(test, "unexpected success")
+
+    def addSubTest(self, test, subtest, err):
+        super().addSubTest(test, subtest, err)
+        if err is not None:
+            failed = issubclass(err[0], test.failureException)
+            self._record(subtest, "failure" if failed else "error", self._exc_info_to_string(err, test))
+
+
+def run_shard(test_ids):
+    started = time.perf_counter()
+    suite = unittest.defaultTestLoader.loadTestsFromNames(test_ids)
+    result = RecordingResult()
+    suite.run(result)
+    # Los workers del pool salen con os._exit y no pasan por atexit: guardar lo aprendido aquí
+    if BasePage.locator_cache is not None:
+        BasePage.locator_cache.flush()
+    return {"pid": os.getpid(), "duration": time.perf_counter() - started, "records": result.records}
+
+
+class RemoteTest:
+    """Sustituto mínimo de un TestCase para poder usar TextTestResult.printErrors()."""
+
+    def __init__(self, record):
+        self._id = record["id"]
+        self._description = record["description"]
+
+    def id(self):
+        return self._id
+
+    def shortDescription(self):
+        return None
+
+    def __str__(self):
+        return self._description
+
+
+def merge_results(shards, stream, verbosity: int = 2):
+    result = unittest.TextTestResult(unittest.runner._WritelnDecorator(stream), True, verbosity)
+    buckets = {
+        "failure": result.failures,
+        "error": result.errors,
+        "skip": result.skipped,
+        "expected failure": result.expectedFailures,
+    }
+    for shard in shards:
+        for record in shard["records"]:
+            test = RemoteTest(record)
+            result.testsRun += 1
+            if verbosity > 1:
+                stream.write(f"{record['description']} ... {record['outcome']} ({record['duration']:.2f}s)\n")
+            if record["outcome"] == "unexpected success":
+                result.unexpectedSuccesses.append(test)
+            elif record["outcome"] in buckets:
+                buckets[record["outcome"]].append((test, record["details"]))
+    return result
+
+
+def run_parallel(names, workers: int, stream=sys.stderr, verbosity: int = 2):
+    # Un solo Chrome por proceso: el pool de tests/test.py vive mientras dure cada shard
+    os.environ["DRIVER_POOL_SIZE"] = "1"
+    test_ids = list(iter_test_ids(unittest.defaultTestLoader.loadTestsFromNames(names)))
+    workers = max(1, min(workers, len(test_ids) or 1))
+    # Reparto round-robin: cada worker ejecuta su shard completo con su propio Chrome
+    shard_ids = [test_ids[i::workers] for i in range(workers)]
+
+    # Con THROTTLE_RATE todos los workers comparten el mismo ritmo; las métricas son de esta ejecución
+    scheduler = shared_scheduler()
+    if scheduler is not None:
+        scheduler.bucket.reset_metrics()
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        shards = list(executor.map(run_shard, [ids for ids in shard_ids if ids]))
+    elapsed = time.perf_counter() - started
+
+    result = merge_results(shards, stream, verbosity)
+    result.printErrors()
+    stream.write(unittest.TextTestResult.separator2 + "\n")
+    stream.write(f"Ran {result.testsRun} tests in {elapsed:.3f}s using {len(shards)} workers\n\n")
+    for index, shard in enumerate(shards):
+        busy = sum(record["duration"] for record in shard["records"])
+        stream.write(
+            f"worker {index} (pid {shard['pid']}): {len(shard['records'])} tests, "
+            f"{shard['duration']:.2f}s wall, {busy:.2f}s in tests\n"
+        )
+    if scheduler is not None:
+        metrics = scheduler.metrics()
+        stream.write(
+            f"throttle: {metrics['requests']} navigations, {metrics['ok_per_minute']}/min ok, "
+            f"block rate {metrics['block_rate']:.1%}, {metrics['retries']} retries, {metrics['waited_s']}s waiting\n"
+        )
+    stream.write("\n" + ("OK" if result.wasSuccessful() else
+                         f"FAILED (failures={len(result.failures)}, errors={len(result.errors)})") + "\n")
+    return result, shards
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", default=["tests.test"], help="Módulos, clases o tests a ejecutar")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Número de procesos (un Chrome cada uno)")
+    parser.add_argument("--json", help="Guardar el detalle por test y por worker en este fichero")
+    parser.add_argument("-q", "--quiet", action="store_true")
+    args = parser.parse_args(argv)
+
+    result, shards = run_parallel(args.names, args.workers, verbosity=1 if args.quiet else 2)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(shards, handle, indent=2)
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""Perfil de recursos del navegador por test: memoria/CPU de Chrome y métricas de la página.
+
+Se activa con PROFILE_DIR=profiles. Alrededor de cada llamada pública a los page objects del
+test se toma una muestra de:
+    * RSS y CPU del árbol de procesos de Chrome (chromedriver y sus hijos), si psutil está instalado.
+    * Performance.getMetrics por CDP: heap de JS, nodos del DOM, layouts y recálculos de estilo.
+Cada test deja profiles/<test>.json con la línea temporal y los umbrales superados
+(PROFILE_THRESHOLDS="dom_nodes=20000,js_heap_used_mb=200" cambia los valores por defecto).
+"""
+import functools
+import inspect
+import json
+import os
+import re
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# Métricas de CDP que se guardan y el nombre con el que aparecen en el informe
+CDP_METRICS = {
+    "JSHeapUsedSize": "js_heap_used_mb",
+    "JSHeapTotalSize": "js_heap_total_mb",
+    "Nodes": "dom_nodes",
+    "Documents": "documents",
+    "JSEventListeners": "js_event_listeners",
+    "LayoutCount": "layout_count",
+    "RecalcStyleCount": "recalc_style_count",
+}
+
+# Umbrales por defecto: un valor absoluto tras la llamada o, con sufijo _delta, el incremento durante ella
+DEFAULT_THRESHOLDS = {
+    "rss_mb": 1500,
+    "js_heap_used_mb": 150,
+    "dom_nodes": 15000,
+    "layout_count_delta": 300,
+}
+
+
+def thresholds_from_env() -> dict:
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    for item in os.environ.get("PROFILE_THRESHOLDS", "").split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            thresholds[name.strip()] = float(value)
+    return thresholds
+
+
+class ResourceProfiler:
+    """Muestrea los recursos de una sesión alrededor de las llamadas a sus page objects."""
+
+    def __init__(self, driver, thresholds: dict = None):
+        self.driver = driver
+        self.thresholds = thresholds if thresholds is not None else thresholds_from_env()
+        self.timeline = []
+        self.breaches = []
+        self._started = time.perf_counter()
+        self._depth = 0
+        self._processes = {}
+        self._cdp = self._enable_cdp()
+
+    def _enable_cdp(self) -> bool:
+        try:
+            self.driver.execute_cdp_cmd("Performance.enable", {})
+            return True
+        except (AttributeError, WebDriverException):
+            return False
+
+    def _process_tree(self):
+        """Procesos de chromedriver y todos sus descendientes (Chrome, renderers, GPU...)."""
+        process = getattr(getattr(self.driver, "service", None), "process", None)
+        if psutil is None or process is None:
+            return []
+        try:
+            root = psutil.Process(process.pid)
+            tree = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return []
+        # Reutilizar los objetos Process para que cpu_percent mida desde la muestra anterior
+        processes = [self._processes.setdefault(item.pid, item) for item in tree]
+        self._processes = {item.pid: item for item in processes}
+        return processes
+
+    def sample(self) -> dict:
+        values = {"t_s": round(time.perf_counter() - self._started, 3)}
+        processes = self._process_tree()
+        if processes:
+            rss, cpu = 0, 0.0
+            for process in processes:
+                try:
+                    rss += process.memory_info().rss
+                    cpu += process.cpu_percent(None)
+                except psutil.Error:
+                    continue
+            values.update(rss_mb=round(rss / 2 ** 20, 1), cpu_percent=round(cpu, 1), processes=len(processes))
+        if self._cdp:
+            try:
+                metrics = {item["name"]: item["value"] for item in self.driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]}
+            except WebDriverException:
+                metrics = {}
+            for name, key in CDP_METRICS.items():
+                if name in metrics:
+                    value = metrics[name]
+                    values[key] = round(value / 2 ** 20, 1) if key.endswith("_mb") else int(value)
+        return values
+
+    def record(self, call: str, before: dict, after: dict):
+        entry = {"call": call, "duration_s": round(after["t_s"] - before["t_s"], 3), "before": before, "after": after}
+        self.timeline.append(entry)
+        for name, limit in self.thresholds.items():
+            if name.endswith("_delta"):
+                key = name[:-len("_delta")]
+                value = after.get(key, 0) - before.get(key, 0) if key in after else None
+            else:
+                value = after.get(name)
+            if value is not None and value > limit:
+                self.breaches.append({"call": call, "metric": name, "value": value, "limit": limit, "url": after.get("url")})
+
+    def wrap(self, *pages):
+        """Instrumenta los métodos públicos de estas instancias de page objects.
+
+        Sólo se muestrea la llamada más externa: lo que un método hace internamente a través
+        de otros métodos públicos queda dentro de la misma entrada de la línea temporal.
+        """
+        for page in pages:
+            for name, function in inspect.getmembers(type(page), inspect.isfunction):
+                if not name.startswith("_"):
+                    setattr(page, name, self._wrapped(f"{type(page).__name__}.{name}", getattr(page, name)))
+        return pages
+
+    def _wrapped(self, call: str, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if self._depth:
+                return method(*args, **kwargs)
+            before = self.sample()
+            self._depth += 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._depth -= 1
+                after = self.sample()
+                try:
+                    after["url"] = self.driver.current_url
+                except WebDriverException:
+                    pass
+                self.record(call, before, after)
+
+        return wrapper
+
+    def peaks(self) -> dict:
+        peaks = {}
+        for entry in self.timeline:
+            for key, value in entry["after"].items():
+                if isinstance(value, (int, float)) and key != "t_s":
+                    peaks[key] = max(peaks.get(key, value), value)
+        return peaks
+
+    def write(self, directory: str, name: str) -> str:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, re.sub(r"[^\w.-]+", "_", name) + ".json")
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump({
+                "psutil": psutil is not None,
+                "cdp": self._cdp,
+                "thresholds": self.thresholds,
+                "peaks": self.peaks(),
+                "breaches": self.breaches,
+                "timeline": self.timeline,
+            }, handle, indent=2)
+        return path
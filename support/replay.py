@@ -0,0 +1,182 @@
+"""Grabación y reproducción offline de las páginas de El Corte Inglés.
+
+Uso:
+    python -m support.replay record --dir recordings --query zapatillas
+    python -m support.replay serve --dir recordings --port 8765
+
+Se graba el DOM ya renderizado (driver.page_source), sin scripts y con los enlaces
+absolutos reescritos a rutas locales, así que las páginas se comportan igual en cada
+ejecución y no dependen de la red ni de la protección anti-bot. El servidor publica las
+páginas en http://www.elcorteingles.es.localhost:<puerto>/ (Chrome resuelve *.localhost a
+127.0.0.1), de modo que las comprobaciones sobre el dominio de los tests siguen valiendo.
+"""
+import argparse
+import json
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+
+SITE_ORIGIN_PATTERN = re.compile(r"https?://www\.elcorteingles\.es(?=/|\"|')")
+SCRIPT_PATTERN = re.compile(r"<script\b[^>]*>.*?</script\s*>", re.IGNORECASE | re.DOTALL)
+REPLAY_HOST = "www.elcorteingles.es.localhost"
+
+
+def request_key(url: str) -> str:
+    """Clave de una petición: ruta más parámetros ordenados (el orden no importa)."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return (parts.path or "/") + ("?" + query if query else "")
+
+
+class ReplayStore:
+    """Directorio con las páginas grabadas y un manifest.json que las indexa por petición."""
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, self.MANIFEST)
+        try:
+            with open(self.manifest_path, encoding="utf-8") as handle:
+                self.entries = json.load(handle)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save_page(self, url: str, html: str, name: str = None) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        key = request_key(url)
+        filename = (name or f"page_{len(self.entries)}") + ".html"
+        with open(os.path.join(self.directory, filename), "w", encoding="utf-8") as handle:
+            handle.write(html)
+        self.entries[key] = {"file": filename, "url": url}
+        with open(self.manifest_path, "w", encoding="utf-8") as handle:
+            json.dump(self.entries, handle, indent=2, ensure_ascii=False)
+        return key
+
+    def lookup(self, path: str):
+        """Devuelve el contenido para una petición: coincidencia exacta o, si no, por ruta."""
+        key = request_key(path)
+        entry = self.entries.get(key)
+        if entry is None:
+            bare_path = key.split("?", 1)[0]
+            entry = next((e for k, e in self.entries.items() if k.split("?", 1)[0] == bare_path), None)
+        if entry is None:
+            return None
+        with open(os.path.join(self.directory, entry["file"]), "rb") as handle:
+            return handle.read()
+
+
+def sanitize_page(html: str, strip_scripts: bool = True) -> str:
+    if strip_scripts:
+        html = SCRIPT_PATTERN.sub("", html)
+    # Enlaces absolutos al sitio real -> rutas relativas al servidor local
+    html = SITE_ORIGIN_PATTERN.sub("", html)
+    if not html.lstrip().lower().startswith("<!doctype"):
+        html = "<!DOCTYPE html>\n" + html
+    return html
+
+
+def record_current_page(driver, store: ReplayStore, name: str = None, strip_scripts: bool = True) -> str:
+    return store.save_page(driver.current_url, sanitize_page(driver.page_source, strip_scripts), name)
+
+
+class ReplayServer:
+    """Servidor HTTP local (en un hilo) que sirve las páginas de un ReplayStore."""
+
+    def __init__(self, store: ReplayStore, host: str = "127.0.0.1", port: int = 0):
+        self.store = store
+        self.requests = []
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_address[1]
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{REPLAY_HOST}:{self.port}/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = server.store.lookup(self.path)
+                server.requests.append((self.path, body is not None))
+                if body is None:
+                    self.send_error(404, "Not recorded")
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def record_flow(directory: str, query: str):
+    from pages.home import HomePage
+    from pages.search_results import SearchResultsPage
+    from support.browser import create_chrome_driver
+
+    store = ReplayStore(directory)
+    driver = create_chrome_driver()
+    try:
+        home = HomePage(driver)
+        results = SearchResultsPage(driver)
+        home.go_to_home()
+        home.accept_cookies_if_present()
+        print("home:", record_current_page(driver, store, "home"))
+        home.search(query)
+        results.get_results_title_text()
+        print("results:", record_current_page(driver, store, f"results_{query}"))
+        results.click_first_product()
+        print("detail:", record_current_page(driver, store, "detail"))
+    finally:
+        driver.quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Graba o reproduce páginas de El Corte Inglés")
+    parser.add_argument("command", choices=["record", "serve"])
+    parser.add_argument("--dir", default="recordings")
+    parser.add_argument("--query", default="zapatillas")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        record_flow(args.dir, args.query)
+        return
+    server = ReplayServer(ReplayStore(args.dir), port=args.port)
+    print(f"Serving {args.dir} at {server.base_url} (ECI_BASE_URL={server.base_url})")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Fachada asyncio para ejecutar varios flujos de búsqueda en pestañas de un mismo Chrome.
+
+Uso: python -m support.tabs zapatillas bolsos camisetas
+
+Una sesión de WebDriver sólo atiende un comando a la vez, así que todos los comandos pasan
+por un único hilo y cada uno se dirige a su pestaña (switch_to.window sólo si cambia).
+La concurrencia está en las cargas: las pestañas se crean por CDP (Target.createTarget),
+el driver usa pageLoadStrategy "none" para que navegar no bloquee, y las esperas de
+wait_for() sueltan el hilo entre sondeo y sondeo para que avancen las demás pestañas.
+Cada pestaña tiene sus propios page objects; las cookies sí son comunes a todo el navegador.
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from pages.artifacts import install_console_hook
+from pages.home import HomePage
+from pages.product_detail import ProductDetailPage
+from pages.search_results import SearchResultsPage
+from support.browser import apply_resource_blocking, create_chrome_driver, headless_from_env
+
+
+# Sin estas opciones Chrome ralentiza los temporizadores y el render de las pestañas en segundo plano
+BACKGROUND_TAB_ARGUMENTS = [
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+]
+
+
+class TabBrowser:
+    """Un Chrome compartido por varias AsyncTab."""
+
+    def __init__(self, driver, profile: str = "default"):
+        self.driver = driver
+        self.profile = profile
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="webdriver")
+        self._current = driver.current_window_handle
+        self._first_tab_free = True
+        # Las cookies son comunes: sólo la primera pestaña que busca espera al banner
+        self.consent_handled = False
+
+    @classmethod
+    def launch(cls, profile: str = "lean", headless: bool = None):
+        driver = create_chrome_driver(profile, headless if headless is not None else headless_from_env(),
+                                      BACKGROUND_TAB_ARGUMENTS, page_load_strategy="none")
+        return cls(driver, profile)
+
+    async def call(self, handle: str, fn, *args, **kwargs):
+        """Ejecuta fn(*args) en el hilo del driver con la pestaña `handle` activa."""
+        def run():
+            if handle != self._current:
+                self.driver.switch_to.window(handle)
+                self._current = handle
+            return fn(*args, **kwargs)
+
+        return await asyncio.get_running_loop().run_in_executor(self._executor, run)
+
+    async def new_tab(self, timeout: int = 15):
+        def create():
+            if self._first_tab_free:
+                self._first_tab_free = False
+                return self._current
+            try:
+                return self.driver.execute_cdp_cmd("Target.createTarget", {"url": "about:blank"})["targetId"]
+            except WebDriverException:
+                self.driver.switch_to.new_window("tab")
+                self._current = self.driver.current_window_handle
+                return self._current
+
+        handle = await asyncio.get_running_loop().run_in_executor(self._executor, create)
+        tab = AsyncTab(self, handle, timeout)
+        # Los scripts de Page.addScriptToEvaluateOnNewDocument y Network.setBlockedURLs se
+        # aplican por pestaña, aunque los page objects los den por instalados en toda la sesión
+        if tab.results.MODAL_WATCHDOG:
+            await tab.run(tab.results.install_modal_watchdog, True)
+        await tab.run(install_console_hook, self.driver, 200, True)
+        if self.profile == "lean":
+            await tab.run(apply_resource_blocking, self.driver)
+        return tab
+
+    async def close(self):
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.driver.quit)
+        self._executor.shutdown()
+
+
+class AsyncTab:
+    """Una pestaña con sus propios page objects. Todas las operaciones son corrutinas."""
+
+    def __init__(self, browser: TabBrowser, handle: str, timeout: int = 15):
+        self.browser = browser
+        self.handle = handle
+        self.timeout = timeout
+        driver = browser.driver
+        self.home = HomePage(driver, timeout)
+        self.results = SearchResultsPage(driver, timeout)
+        self.detail = ProductDetailPage(driver, timeout)
+
+    async def run(self, fn, *args, **kwargs):
+        return await self.browser.call(self.handle, fn, *args, **kwargs)
+
+    async def navigate(self, url: str):
+        # Con pageLoadStrategy "none" driver.get vuelve en cuanto empieza la navegación
+        await self.run(self.results.open, url)
+
+    async def current_url(self) -> str:
+        return await self.run(lambda: self.browser.driver.current_url)
+
+    async def wait_for(self, locators, predicate=None, timeout: float = None, poll: float = 0.1):
+        """Como BasePage.wait_for_probe, pero cediendo el driver a otras pestañas entre sondeos."""
+        if predicate is None:
+            predicate = lambda result: result["visible"] > 0
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        while True:
+            try:
+                results = await self.run(self.results.probe, locators)
+            except WebDriverException:
+                results = []
+            hit = next((result for result in results if predicate(result)), None)
+            if hit is not None:
+                return hit
+            if time.monotonic() > deadline:
+                raise TimeoutException(f"None of {len(locators)} locators matched in tab {self.handle}")
+            await asyncio.sleep(poll)
+
+    async def close(self):
+        await self.run(self.browser.driver.close)
+
+
+async def search_flow(tab: AsyncTab, query: str, use_search_bar: bool = False) -> dict:
+    """Búsqueda completa en una pestaña: resultados, título y número de productos."""
+    started = time.perf_counter()
+    if use_search_bar:
+        await tab.navigate(tab.home.BASE_URL)
+        await tab.wait_for(HomePage.SEARCH_BUTTON_LOCATORS + HomePage.SEARCH_INPUT_LOCATORS)
+        if tab.browser.consent_handled:
+            # Si el banner llega a salir en esta pestaña, se cierra; si no, no se espera por él
+            await tab.run(tab.home.accept_cookies_if_present, 1)
+        else:
+            tab.browser.consent_handled = True
+            await tab.run(tab.home.accept_cookies_if_present)
+        await tab.run(tab.home.search, query)
+    else:
+        await tab.navigate(tab.results.build_search_url(query))
+    await tab.wait_for(SearchResultsPage.PRODUCT_GRID_ITEMS_LOCATORS, lambda result: result["count"] > 0)
+    title = await tab.run(tab.results.get_results_title_text)
+    count = await tab.run(tab.results.count_listed_products)
+    return {
+        "query": query,
+        "url": await tab.current_url(),
+        "title": title,
+        "products": count,
+        "elapsed_s": round(time.perf_counter() - started, 2),
+    }
+
+
+async def run_searches(queries, profile: str = "lean", use_search_bar: bool = False):
+    browser = TabBrowser.launch(profile)
+    try:
+        tabs = [await browser.new_tab() for _ in queries]
+        return await asyncio.gather(
+            *(search_flow(tab, query, use_search_bar) for tab, query in zip(tabs, queries)),
+            return_exceptions=True,
+        )
+    finally:
+        await browser.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Varias búsquedas a la vez en pestañas de un solo Chrome")
+    parser.add_argument("queries", nargs="+")
+    parser.add_argument("--profile", default="lean")
+    parser.add_argument("--search-bar", action="store_true", help="Buscar desde la home en vez de por URL")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    for result in asyncio.run(run_searches(args.queries, args.profile, args.search_bar)):
+        print(result)
+    print(f"{len(args.queries)} flows in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
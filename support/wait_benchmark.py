@@ -0,0 +1,63 @@
+"""Compara la latencia de detección de los motores de espera (polling vs observer).
+
+Uso: python -m support.wait_benchmark --runs 20 --delay 700
+
+En una página vacía se programa la inserción de un nodo tras `delay` ms y se mide cuánto
+tarda cada motor en devolverlo. El exceso sobre `delay` es la latencia añadida por la espera.
+"""
+import argparse
+import statistics
+import time
+
+from selenium.webdriver.common.by import By
+
+from pages.waits import WAIT_ENGINES
+from support.browser import create_chrome_driver
+
+
+BLANK_PAGE = "data:text/html,<html><body></body></html>"
+INSERT_LATER_SCRIPT = """
+setTimeout(function () {
+    var node = document.createElement('div');
+    node.id = 'late-node';
+    node.textContent = 'ready';
+    document.body.appendChild(node);
+}, arguments[0]);
+"""
+
+
+def measure_engine(driver, engine_name: str, delay_ms: int, runs: int):
+    engine = WAIT_ENGINES[engine_name](driver, timeout=max(5, delay_ms / 1000 * 3))
+    overheads = []
+    for _ in range(runs):
+        driver.get(BLANK_PAGE)
+        started = time.perf_counter()
+        driver.execute_script(INSERT_LATER_SCRIPT, delay_ms)
+        engine.until_any([(By.ID, "late-node")], "visible")
+        overheads.append((time.perf_counter() - started) * 1000 - delay_ms)
+    overheads.sort()
+    return {
+        "mean_ms": statistics.mean(overheads),
+        "p50_ms": overheads[len(overheads) // 2],
+        "p95_ms": overheads[min(len(overheads) - 1, int(len(overheads) * 0.95))],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latencia añadida por cada motor de espera")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--delay", type=int, default=700, help="ms hasta que aparece el nodo")
+    parser.add_argument("--profile", default="lean")
+    args = parser.parse_args(argv)
+
+    driver = create_chrome_driver(args.profile)
+    try:
+        for name in WAIT_ENGINES:
+            stats = measure_engine(driver, name, args.delay, args.runs)
+            print(f"{name:9} mean {stats['mean_ms']:7.1f} ms  p50 {stats['p50_ms']:7.1f} ms  p95 {stats['p95_ms']:7.1f} ms")
+    finally:
+        driver.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,79 @@
+import os
 import unittest
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+import warnings
+from functools import partial
 
+from pages.base import clear_modal_watchdog_log
 from pages.home import HomePage
 from pages.search_results import SearchResultsPage
 from pages.product_detail import ProductDetailPage
+from pages.instrumentation import step_log
+from support.browser import create_chrome_driver
+from support.driver_pool import DriverPool
+from support.profiler import ResourceProfiler
+from support.replay import ReplayServer, ReplayStore
+
+
+# Warm Chrome sessions shared by the tests, one pool per browser profile;
+# each session is reset between leases
+DRIVER_POOLS = {}
+REPLAY_SERVER = None
+
+
+def driver_pool(profile: str) -> DriverPool:
+    if profile not in DRIVER_POOLS:
+        DRIVER_POOLS[profile] = DriverPool.from_env(partial(create_chrome_driver, profile))
+    return DRIVER_POOLS[profile]
+
+
+def setUpModule():
+    # REPLAY_DIR=recordings runs the suite against pages recorded with support/replay.py
+    global REPLAY_SERVER
+    if os.environ.get("REPLAY_DIR"):
+        REPLAY_SERVER = ReplayServer(ReplayStore(os.environ["REPLAY_DIR"])).start()
+        HomePage.BASE_URL = REPLAY_SERVER.base_url
+
+
+def tearDownModule():
+    for pool in DRIVER_POOLS.values():
+        pool.close()
+    if REPLAY_SERVER is not None:
+        REPLAY_SERVER.stop()
 
 
 class ElCorteInglesTests(unittest.TestCase):
+    # "default" or "lean" (see support/browser.py); subclasses may override it
+    BROWSER_PROFILE = os.environ.get("BROWSER_PROFILE", "default")
+
     def setUp(self):
-        options = Options()
-        # Anti-automation configuration provided in the brief
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-
-        # Recommended additional stability options
-        options.add_argument("--start-maximized")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-
-        self.service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=self.service, options=options)
-
-        # Use a clean start for each test to guarantee independence
+        self.driver = driver_pool(self.BROWSER_PROFILE).acquire()
+        # Return the lease even if setUp or tearDown fail after this point
+        self.addCleanup(driver_pool(self.BROWSER_PROFILE).release, self.driver)
+
+        # Every lease starts on about:blank with cookies and storage cleared
         self.home = HomePage(self.driver)
         self.results = SearchResultsPage(self.driver)
         self.detail = ProductDetailPage(self.driver)
 
+        # PROFILE_DIR=profiles samples Chrome memory/CPU and page metrics around every page-object call
+        self.profiler = None
+        if os.environ.get("PROFILE_DIR"):
+            self.profiler = ResourceProfiler(self.driver)
+            self.profiler.wrap(self.home, self.results, self.detail)
+
     def tearDown(self):
-        self.driver.quit()
+        if self.profiler is not None:
+            self.profiler.write(os.environ["PROFILE_DIR"], self.id())
+            if self.profiler.breaches:
+                # Details are in the JSON report; only flag the test here
+                warnings.warn(f"{self.id()}: {len(self.profiler.breaches)} resource threshold breaches, "
+                              f"see {os.environ['PROFILE_DIR']}", RuntimeWarning)
+        # PERF_REPORT_DIR=reports writes a JSON/CSV timing report per test
+        log = step_log(self.driver)
+        if os.environ.get("PERF_REPORT_DIR"):
+            log.write_report(os.environ["PERF_REPORT_DIR"], self.id())
+        log.clear()
+        clear_modal_watchdog_log(self.driver)
 
     # 4.1: Access Home and accept cookies (Test 1)
     def test_01_access_home_and_accept_cookies(self):
@@ -44,8 +85,7 @@ class ElCorteInglesTests(unittest.TestCase):
 
     # 4.2: Search for product "zapatillas" (Test 2)
     def test_02_search_zapatillas_and_verify(self):
-        self.home.go_to_home()
-        self.home.accept_cookies_if_present()
+        self.home.go_to_home_with_consent()
         self.home.search("zapatillas")
 
         current_url = self.results.get_current_url()
@@ -57,9 +97,8 @@ class ElCorteInglesTests(unittest.TestCase):
 
     # 4.3: Access first product detail from results (Test 3)
     def test_03_open_first_product_detail(self):
-        self.home.go_to_home()
-        self.home.accept_cookies_if_present()
-        self.home.search("zapatillas")
+        # The search bar is covered by test 2; go straight to the results URL
+        self.results.open_for_query("zapatillas")
 
         results_url = self.results.get_current_url()
         self.results.click_first_product()
@@ -67,12 +106,35 @@ class ElCorteInglesTests(unittest.TestCase):
         detail_url = self.detail.get_current_url()
         self.assertNotEqual(results_url, detail_url, "Detail URL should differ from results URL.")
         self.assertTrue(self.detail.is_on_product_detail(), "Product detail indicators not found on the page.")
+
+    # Direct results URL must match the one produced by the search bar
+    def test_05_direct_search_url_matches_search_bar(self):
+        self.home.go_to_home_with_consent()
+        self.home.search("zapatillas")
+        ui_url = self.results.get_current_url()
+        self.assertTrue(self.results.matches_search_url(ui_url, "zapatillas"),
+                        f"Search bar URL '{ui_url}' differs from '{self.results.build_search_url('zapatillas')}'.")
+
+        self.results.open_for_query("zapatillas")
+        self.assertIn("zapatillas", self.results.get_current_url().lower(), "Search term not present in direct URL.")
+        self.assertIn("zapatillas", self.results.get_results_title_text().lower(),
+                      "Direct results title does not contain the search term.")
+
+    # The facet URL built by build_search_url must be the one the brand filter UI navigates to
+    def test_06_brand_facet_url_matches_filter_ui(self):
+        self.results.open_for_query("zapatillas")
+        self.assertTrue(self.results.open_brand_filter(), "Brand filter toggle could not be opened.")
+        self.assertTrue(self.results.choose_brand("Nike"), "Brand option could not be selected.")
+        self.results.apply_filter(timeout=1)
+
+        ui_url = self.results.wait_for_url(lambda url: "nike" in url.lower())
+        self.assertTrue(self.results.matches_facet_url(ui_url, "brand", "Nike"),
+                        f"Filter UI URL '{ui_url}' differs from '{self.results.build_search_url('zapatillas', {'brand': 'Nike'})}'.")
+
 """
     # 4.4: Optional filter by brand (Test 4)
     def test_04_apply_brand_filter_optional(self):
-        self.home.go_to_home()
-        self.home.accept_cookies_if_present()
-        self.home.search("zapatillas")
+        self.results.open_for_query("zapatillas")
 
         # Count products before applying a brand filter
         initial_count = self.results.count_listed_products()